@@ -1,63 +1,139 @@
 # backend/app/api/endpoints/chat.py
 
-import json
 from typing import List, Optional
 
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Depends
 from fastapi import Request as ServerRequest
+from fastapi import Response
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from app.services.AIService import AIService
+from app.config import settings
+from app.database.qdrant.filters import SearchFilter
+from app.services.ServiceContainer import ServiceContainer, get_services
+from app.services.StorageService import StorageService
 from app.utils.logger import CustomLogger
 from app.utils.response import error_response
+from app.utils.sse import STREAM_HEADERS, stream_events
 
 router = APIRouter()
 
+NO_INFORMATION_MESSAGE = "I apologize, but I don't have any relevant information in my knowledge base to answer your question. Please try asking something else or rephrase your question."
+
+
+class ChatFilters(BaseModel):
+    notebook_id: Optional[str] = None
+    session_id: Optional[str] = None
+    # Inclusive page range
+    page_from: Optional[int] = Field(None, ge=1)
+    page_to: Optional[int] = Field(None, ge=1)
+
+
+def page_blob_name(
+    metadata: dict, storage_service: StorageService, size: Optional[str] = None
+) -> Optional[str]:
+    # Pages captured before derivatives existed fall back to the original
+    derivative = (metadata.get("derivatives") or {}).get(size)
+    if derivative:
+        return derivative
+    # Chunks indexed before blob names were stored only have a signed URL
+    blob_name = metadata.get("blob_name")
+    if blob_name is None and metadata.get("image_path"):
+        blob_name = storage_service.blob_name_from_url(metadata["image_path"])
+    return blob_name
+
 
 class ChatRequestBody(BaseModel):
     query: str
     history: Optional[List[dict]] = []
+    # Searches every notebook when not given
+    filters: Optional[ChatFilters] = None
+    k: int = Field(2, ge=1, le=settings.SEARCH_MAX_K)
 
 
 @router.post("/chat")
-async def chat(request: ServerRequest, response: Response, body: ChatRequestBody):
+async def chat(
+    request: ServerRequest,
+    response: Response,
+    body: ChatRequestBody,
+    services: ServiceContainer = Depends(get_services),
+):
     try:
         CustomLogger.create_log("info", f"Received chat request: {body.query}")
-        ai_service = AIService()
+        ai_service = services.ai_service
+        storage_service = services.storage_service
 
         async def generate():
             try:
                 # First, get the source documents with images
-                documents = ai_service.get_documents(body.query)
+                search_filter = (
+                    SearchFilter(**body.filters.model_dump()) if body.filters else None
+                )
+                documents, query_vector = await ai_service.retrieve(
+                    body.query, search_filter, k=body.k
+                )
+
+                # Send the source images as a JSON object, one per page since
+                # several chunks of the same page can be retrieved
+                pages = {}
+                for doc in documents:
+                    page = (
+                        doc.metadata.get("notebook_id"),
+                        doc.metadata["page_number"],
+                    )
+                    pages.setdefault(page, doc)
 
-                # Send the source images as a JSON object
-                source_images = [
+                # The grid shows thumbnails and opens the preview, so the
+                # full resolution capture is never sent to the chat UI
+                blob_names = [
                     {
-                        "page_number": doc.metadata["page_number"],
-                        "image_path": doc.metadata["image_path"],
-                        "score": doc.metadata["score"],
+                        size: page_blob_name(doc.metadata, storage_service, size)
+                        for size in ("thumbnail", "preview")
                     }
-                    for doc in documents
+                    for doc in pages.values()
                 ]
-                yield f"data: {json.dumps({'type': 'source_images', 'images': source_images})}\n\n"
+                # Sign every image in one call, mostly served from the URL cache
+                signed_urls = await storage_service.asign_urls(
+                    name for sizes in blob_names for name in sizes.values() if name
+                )
+                source_images = []
+                for doc, sizes in zip(pages.values(), blob_names):
+                    fallback = doc.metadata.get("image_path")
+                    source_images.append(
+                        {
+                            "page_number": doc.metadata["page_number"],
+                            "image_path": signed_urls.get(sizes["preview"]) or fallback,
+                            "thumbnail_path": signed_urls.get(sizes["thumbnail"])
+                            or fallback,
+                            "score": doc.metadata["score"],
+                        }
+                    )
+                yield {"type": "source_images", "images": source_images}
 
-                # Then stream the response
+                # Then stream the response, reusing the documents and query
+                # vector retrieved above
                 response_stream = await ai_service.get_response(
-                    body.query, body.history
+                    body.query, body.history, documents, query_vector
                 )
                 async for chunk in response_stream:
-                    yield f"data: {json.dumps({'type': 'response', 'content': chunk})}\n\n"
+                    yield {"type": "response", "content": chunk}
             except Exception as e:
                 if "not found in the storage" in str(e):
-                    yield f"data: {json.dumps({'type': 'response', 'content': 'I apologize, but I don\'t have any relevant information in my knowledge base to answer your question. Please try asking something else or rephrase your question.'})}\n\n"
+                    yield {"type": "response", "content": NO_INFORMATION_MESSAGE}
                 else:
                     CustomLogger.create_log(
                         "error", f"Error in generate function: {str(e)}"
                     )
-                    yield f"data: {json.dumps({'type': 'response', 'content': f'An error occurred while processing your request: {str(e)}'})}\n\n"
+                    yield {
+                        "type": "response",
+                        "content": f"An error occurred while processing your request: {str(e)}",
+                    }
 
-        return StreamingResponse(generate(), media_type="text/event-stream")
+        return StreamingResponse(
+            stream_events(request, generate()),
+            media_type="text/event-stream",
+            headers=STREAM_HEADERS,
+        )
 
     except Exception as e:
         CustomLogger.create_log("error", f"Error in chat endpoint: {str(e)}")
@@ -0,0 +1,35 @@
+# backend/app/api/endpoints/files.py
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from app.services.ServiceContainer import ServiceContainer, get_services
+from app.services.StorageService import LocalBackend
+
+router = APIRouter()
+
+
+# Target of the signed URLs made by the local storage backend. GCS serves its
+# own signed URLs, so this only answers when STORAGE_BACKEND is "local".
+@router.get("/files/{blob_name:path}")
+async def get_file(
+    blob_name: str,
+    expires: int,
+    signature: str,
+    services: ServiceContainer = Depends(get_services),
+):
+    storage_service = services.storage_service
+    backend = storage_service.backend
+    if not isinstance(backend, LocalBackend) or not backend.verify(
+        blob_name, expires, signature
+    ):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    result = await storage_service.adownload_bytes(blob_name)
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return Response(
+        content=result["data"],
+        media_type=result["content_type"] or "application/octet-stream",
+        headers={"Cache-Control": "private, max-age=3600"},
+    )
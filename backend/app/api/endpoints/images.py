@@ -1,28 +1,66 @@
 # backend/app/api/endpoints/images.py
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import RedirectResponse
+from typing import Literal, Optional
 
-from app.config import settings
-from app.services.GCPBucketService import GCPBucketService
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+
+from app.services.ClickPictureService.derivatives import derivative_blob_name
+from app.services.ServiceContainer import ServiceContainer, get_services
+from app.services.StorageService import BlobNotFound
 
 router = APIRouter()
-bucket_service = GCPBucketService(settings.GCP_BUCKET_NAME)
 
+CACHE_CONTROL = "private, max-age=3600"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names etag, comparing weakly."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
 
-@router.get("/images/{filename}")
-async def get_image(filename: str):
-    try:
-        blob = bucket_service.bucket.blob(f"captures/{filename}")
-        url = blob.generate_signed_url(
-            version="v4",
-            expiration=3600,
-            method="GET",
-        )
 
-        if not url:
+# filename may include the scan session folder, e.g. <session_id>/capture_1.jpg.
+# size picks a downscaled copy made by the ingestion workers instead of the
+# original. Remote storage is read through the local disk cache, which holds
+# every page this backend captured. A browser revalidating its copy with
+# If-None-Match gets a 304 without the image being read.
+@router.get("/images/{filename:path}")
+async def get_image(
+    filename: str,
+    size: Literal["original", "preview", "thumbnail"] = "original",
+    if_none_match: Optional[str] = Header(None),
+    services: ServiceContainer = Depends(get_services),
+):
+    if ".." in filename.split("/"):
+        raise HTTPException(status_code=404, detail="Image not found")
+    blob_name = f"captures/{filename}"
+    if size != "original":
+        blob_name = derivative_blob_name(blob_name, size)
+    storage_service = services.storage_service
+
+    if if_none_match:
+        try:
+            info = await storage_service.ablob_info(blob_name)
+        except BlobNotFound:
             raise HTTPException(status_code=404, detail="Image not found")
+        etag = f'"{info.generation}"'
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=304,
+                headers={"Cache-Control": CACHE_CONTROL, "ETag": etag},
+            )
 
-        return RedirectResponse(url=url)
-    except Exception:
+    result = await storage_service.adownload_bytes(blob_name)
+    if not result["success"]:
         raise HTTPException(status_code=404, detail="Image not found")
+
+    return Response(
+        content=result["data"],
+        media_type=result["content_type"] or "application/octet-stream",
+        headers={
+            "Cache-Control": CACHE_CONTROL,
+            "ETag": f'"{result["generation"]}"',
+        },
+    )
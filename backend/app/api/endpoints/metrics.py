@@ -0,0 +1,33 @@
+# backend/app/api/endpoints/metrics.py
+
+from fastapi import APIRouter, Depends
+
+from app.services.ServiceContainer import ServiceContainer, get_services
+from app.utils.response import success_response
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics(services: ServiceContainer = Depends(get_services)):
+    ai_service = services.ai_service
+    qdrant_db = services.qdrant_db
+    storage_service = services.storage_service
+    return success_response(
+        "Metrics retrieved",
+        data={
+            "response_cache": ai_service.response_cache.stats(),
+            "embedding_cache": qdrant_db.embedding_cache.stats(),
+            "signed_urls": storage_service.signed_urls.stats(),
+            # None for the local backend, whose reads are already local
+            "storage_cache": (
+                storage_service.disk_cache.stats()
+                if storage_service.disk_cache is not None
+                else None
+            ),
+            "ocr_cleanup": ai_service.cleanup_stats(),
+            "cleanup": services.cleanup_service.stats(),
+            "lexical_index": {"chunks": len(qdrant_db.lexical_index)},
+            "collection_version": qdrant_db.collection_version,
+        },
+    )
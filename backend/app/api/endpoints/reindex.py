@@ -0,0 +1,54 @@
+# backend/app/api/endpoints/reindex.py
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response
+from pydantic import BaseModel
+
+from app.services.ClickPictureService.epochs import epoch_prefix, read_epoch
+from app.services.ScanSessionService import SESSION_ID_PATTERN, capture_root
+from app.services.ServiceContainer import ServiceContainer, get_services
+from app.utils.response import error_response, success_response
+
+router = APIRouter()
+
+
+class ReindexRequestBody(BaseModel):
+    session_id: str
+    # Defaults to the session ID, as for scan sessions
+    notebook_id: Optional[str] = None
+
+
+# Re-OCRs and re-indexes the current captures of a scan session with bulk
+# upserts, e.g. after changing the chunking or cleanup settings. Runs in the
+# background after the response; progress is logged.
+@router.post("/reindex")
+async def reindex(
+    body: ReindexRequestBody,
+    response: Response,
+    services: ServiceContainer = Depends(get_services),
+):
+    notebook_id = body.notebook_id or body.session_id
+    for value in (body.session_id, notebook_id):
+        if not SESSION_ID_PATTERN.match(value):
+            return error_response(
+                f"Invalid session or notebook ID: {value}", code=400, response=response
+            )
+    if services.scan_sessions.get(body.session_id) is not None:
+        return error_response("Session is being scanned", code=409, response=response)
+
+    root = capture_root(body.session_id)
+    epoch = await asyncio.to_thread(read_epoch, services.storage_service, root)
+    if not services.ingestion_service.start_reindex(
+        body.session_id, notebook_id, epoch_prefix(root, epoch)
+    ):
+        return error_response(
+            "Session is already being re-indexed", code=409, response=response
+        )
+    return success_response(
+        "Re-indexing started",
+        code=202,
+        response=response,
+        data={"session_id": body.session_id, "notebook_id": notebook_id},
+    )
@@ -2,8 +2,11 @@
 
 from fastapi import APIRouter
 
-from app.api.endpoints import chat, images
+from app.api.endpoints import chat, files, images, metrics, reindex
 
 api_router = APIRouter()
 api_router.include_router(chat.router, tags=["chat"])
 api_router.include_router(images.router, tags=["images"])
+api_router.include_router(files.router, tags=["files"])
+api_router.include_router(metrics.router, tags=["metrics"])
+api_router.include_router(reindex.router, tags=["reindex"])
@@ -1,5 +1,6 @@
 # backend/app/config.py
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 from app.constants import PROJECT_NAME
@@ -17,11 +18,78 @@ class Settings(BaseSettings):
     QDRANT_URL: str = "http://localhost:6333"
     QDRANT_API_KEY: str = ""
     QDRANT_COLLECTION_NAME: str = "genaigenesis"
+    EMBEDDING_CACHE_SIZE: int = 1024  # Max query embeddings kept in memory
+    EMBEDDING_CACHE_TTL_SECONDS: int = 3600
+    INGESTION_WORKERS: int = 4  # Pages processed concurrently after capture
+    INGESTION_QUEUE_SIZE: int = 32
+    OCR_BATCH_SIZE: int = 8  # Images per Vision batch_annotate_images request
+    OCR_MAX_CONCURRENT_BATCHES: int = 4
+    CHUNK_MAX_TOKENS: int = 200  # Approximate tokens per indexed chunk
+    CHUNK_OVERLAP_TOKENS: int = 40
+    EMBEDDING_BATCH_SIZE: int = 64  # Texts per embed_documents request
+    QDRANT_UPSERT_BATCH_SIZE: int = 256  # Points per Qdrant upsert request
+    QDRANT_UPSERT_PARALLEL: int = 2
+    DUPLICATE_HASH_SIZE: int = 16  # pHash grid size, giving size * size bits
+    DUPLICATE_HASH_THRESHOLD: int = 24  # Max Hamming distance for a duplicate page
+    DUPLICATE_HASH_WINDOW: int = 3  # Recent pages compared against each capture
+    MANIFEST_FLUSH_SECONDS: float = 5.0  # Max delay before a capture is in the manifest
+    OCR_CLEANUP_PARAGRAPH_CONFIDENCE: float = 0.9  # Paragraphs below go to the LLM
+    OCR_CLEANUP_WORD_CONFIDENCE: float = 0.6  # Any word below sends its paragraph too
+    OCR_CLEANUP_CONCURRENCY: int = 4  # Pages cleaned by the LLM at once
+    SEARCH_MODE: str = "hybrid"  # dense, lexical or hybrid (reciprocal rank fusion)
+    SEARCH_CANDIDATES: int = 20  # Results taken from each retriever before fusing
+    SEARCH_DENSE_TIMEOUT_SECONDS: float = 2.0  # Answer lexically after this
+    SEARCH_MAX_K: int = 20  # Upper bound on k accepted by /api/chat
+    RESPONSE_CACHE_SIZE: int = 512  # Chat answers kept for similar questions
+    RESPONSE_CACHE_THRESHOLD: float = 0.95  # Min cosine similarity of the queries
+    SSE_COALESCE_WINDOW_SECONDS: float = 0.05  # Max delay before merged text is sent
+    SSE_COALESCE_MAX_CHARS: int = 1024
+    SSE_HEARTBEAT_SECONDS: float = 15.0  # Keep-alive comment after this much silence
+    SSE_BUFFER_SIZE: int = 64  # Events buffered per client before generation waits
+    SSE_DISCONNECT_POLL_SECONDS: float = 0.5
+    FRONTEND_QUEUE_SIZE: int = 100  # Outbound messages queued per frontend socket
+    FRONTEND_SLOW_CLIENT_POLICY: str = "drop_oldest"  # or "disconnect"
+    SIGNED_URL_EXPIRATION_SECONDS: int = 3600  # Lifetime of signed image URLs
+    SIGNED_URL_REFRESH_MARGIN_SECONDS: int = 300  # Re-sign when less is left
+    SIGNED_URL_CACHE_SIZE: int = 4096
+    IMAGE_THUMBNAIL_WIDTH: int = 320  # Pixels; made by the ingestion workers
+    IMAGE_PREVIEW_WIDTH: int = 1280
+    IMAGE_DERIVATIVE_FORMAT: str = "webp"  # or "jpg"
+    IMAGE_DERIVATIVE_QUALITY: int = 80
+    STORAGE_BACKEND: str = "gcs"  # or "local" to keep blobs on this machine
+    STORAGE_LOCAL_ROOT: str = "storage"
+    STORAGE_LOCAL_URL: str = "http://localhost:8000/api/files"  # Base of signed URLs
+    STORAGE_LOCAL_SIGNING_KEY: str = ""  # Random per process when empty
+    STORAGE_IO_WORKERS: int = 16  # Threads for blocking blob I/O
+    STORAGE_CACHE_DIR: str = ".cache/storage"  # Local copies of bucket blobs
+    STORAGE_CACHE_MAX_BYTES: int = 2 * 1024**3
+    STORAGE_REVALIDATE_SECONDS: float = 60.0  # Trust a known generation this long
+    STORAGE_HTTP_POOL_SIZE: int = 32  # Keep-alive connections to GCS
+    CLEANUP_JOURNAL_BLOB: str = "cleanup/journal.json"  # Resumes resets after a crash
+    CLEANUP_DELETE_BATCH_SIZE: int = 100  # Most deletes one GCS batch request takes
+    CLEANUP_RETRY_SECONDS: float = 30.0
+    CAMERA_FRAME_BUFFER_SIZE: int = 6  # Recent frames a capture picks the sharpest of
+    CAMERA_SHARPNESS_WIDTH: int = 480  # Frames are scored for sharpness at this width
+    CAMERA_FRAME_TIMEOUT_SECONDS: float = 2.0  # Wait for a first frame after opening
+    CAMERA_SETTLE_FRAMES: int = 4  # Still frames in a row before an auto capture
+    CAMERA_SETTLE_THRESHOLD: float = 2.0  # Max mean gray-level change of a still frame
+    CAMERA_SETTLE_WIDTH: int = 160  # Frames are compared for motion at this width
+    CAMERA_SETTLE_TIMEOUT_SECONDS: float = 10.0  # Capture anyway after this long
     LANGSMITH_TRACING: str
     LANGSMITH_ENDPOINT: str
     LANGSMITH_API_KEY: str
     LANGSMITH_PROJECT: str
 
+    @model_validator(mode="after")
+    def check_chunk_overlap(self):
+        # An overlap as large as the chunk would advance long paragraphs one
+        # word per chunk
+        if not 0 <= self.CHUNK_OVERLAP_TOKENS < self.CHUNK_MAX_TOKENS:
+            raise ValueError(
+                "CHUNK_OVERLAP_TOKENS must be at least 0 and less than CHUNK_MAX_TOKENS"
+            )
+        return self
+
     class Config:
         env_file = ".env"
 
@@ -1,61 +1,102 @@
 # backend/app/database/qdrant/__init__.py
 
+import asyncio
+import dataclasses
 import os
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_google_vertexai import VertexAIEmbeddings
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import (
+    Batch,
+    Distance,
+    FilterSelector,
+    PayloadSchemaType,
+    VectorParams,
+)
 
 from app.config import settings
+from app.database.qdrant.cache import EmbeddingCache
+from app.database.qdrant.filters import (
+    SearchFilter,
+    is_stale,
+    stale_versions_filter,
+    version_scope,
+)
+from app.database.qdrant.lexical import LexicalIndex
+from app.utils.chunking import chunk_text
 from app.utils.logger import CustomLogger
 
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = settings.GOOGLE_APPLICATION_CREDENTIALS
 
+SEARCH_MODES = ("dense", "lexical", "hybrid")
+# Standard reciprocal rank fusion constant, damping the weight of top ranks
+RRF_K = 60
+# Metadata fields that searches and deletes filter on, indexed in Qdrant
+PAYLOAD_INDEXES = {
+    "metadata.notebook_id": PayloadSchemaType.KEYWORD,
+    "metadata.session_id": PayloadSchemaType.KEYWORD,
+    "metadata.page": PayloadSchemaType.INTEGER,
+    "metadata.notebook_version": PayloadSchemaType.KEYWORD,
+}
 
-class QdrantDatabase:
-    def __init__(self):
-        try:
-            if settings.PYTHON_ENV.lower() == "prod":
-                CustomLogger.create_log("info", "Connecting to Qdrant Cloud (PROD)")
-                self.client = QdrantClient(
-                    url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY
-                )
-            else:
-                CustomLogger.create_log("info", "Connecting to Qdrant Local (DEV)")
-                self.client = QdrantClient(url="http://localhost:6333")
-
-            self.client.get_collections()
-            CustomLogger.create_log("info", "Successfully connected to Qdrant")
 
-            # If you change the model, you need to change the dimension size
-            self.embeddings = VertexAIEmbeddings(model_name="text-embedding-005")
+class QdrantDatabase:
+    def __init__(
+        self,
+        client: Optional[AsyncQdrantClient] = None,
+        embeddings: Optional[Embeddings] = None,
+    ):
+        if client is not None:
+            self.client = client
+        elif settings.PYTHON_ENV.lower() == "prod":
+            CustomLogger.create_log("info", "Connecting to Qdrant Cloud (PROD)")
+            self.client = AsyncQdrantClient(
+                url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY
+            )
+        else:
+            CustomLogger.create_log("info", "Connecting to Qdrant Local (DEV)")
+            self.client = AsyncQdrantClient(url="http://localhost:6333")
 
-            self._ensure_collection_exists()
+        # If you change the model, you need to change the dimension size
+        self.embeddings = embeddings or VertexAIEmbeddings(
+            model_name="text-embedding-005"
+        )
+        self.embedding_cache = EmbeddingCache(
+            maxsize=settings.EMBEDDING_CACHE_SIZE,
+            ttl=settings.EMBEDDING_CACHE_TTL_SECONDS,
+        )
+        self.lexical_index = LexicalIndex()
+        # Bumped whenever the collection changes, so derived caches can expire
+        self.collection_version = 0
+        # Version stamped on new chunks of each version scope, i.e. one scan
+        # session's pages in one notebook. Resetting a scope switches it to a
+        # new version and hides every other version from searches until
+        # collect_notebook has deleted them
+        self.notebook_versions: Dict[str, str] = {}
+        self.retired: Dict[str, str] = {}
 
-            self.vector_store = QdrantVectorStore(
-                client=self.client,
-                collection_name=settings.QDRANT_COLLECTION_NAME,
-                embedding=self.embeddings,
-            )
+    async def initialize(self):
+        try:
+            # Doubles as the connectivity check, so Qdrant is only asked once
+            await self._ensure_collection_exists()
+            CustomLogger.create_log("info", "Successfully connected to Qdrant")
+            await self._load_lexical_index()
         except Exception as e:
             CustomLogger.create_log("error", f"Failed to connect to Qdrant: {str(e)}")
             raise Exception(f"Failed to connect to Qdrant database: {str(e)}")
 
-    def _ensure_collection_exists(self):
-        collections = self.client.get_collections()
-        collection_exists = any(
-            collection.name == settings.QDRANT_COLLECTION_NAME
-            for collection in collections.collections
-        )
-
-        if not collection_exists:
+    async def _ensure_collection_exists(self):
+        if not await self.client.collection_exists(settings.QDRANT_COLLECTION_NAME):
             CustomLogger.create_log(
                 "info",
                 f"Creating collection {settings.QDRANT_COLLECTION_NAME} in Qdrant",
             )
-            self.client.create_collection(
+            await self.client.create_collection(
                 collection_name=settings.QDRANT_COLLECTION_NAME,
                 # Dimension size is 768 since text-embedding-005 (model that we are using for embeddings) has 768 dimensions
                 vectors_config=VectorParams(size=768, distance=Distance.COSINE),
@@ -65,10 +106,40 @@ class QdrantDatabase:
                 "info",
                 f"Collection {settings.QDRANT_COLLECTION_NAME} already exists in Qdrant",
             )
+        await self._ensure_payload_indexes()
+
+    async def _ensure_payload_indexes(self):
+        # Creating an index that already exists is a no-op in Qdrant, so
+        # collections made before an index was added get it on startup
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            await self.client.create_payload_index(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                field_name=field_name,
+                field_schema=field_schema,
+            )
+
+    async def _load_lexical_index(self):
+        # The lexical index lives in memory, so rebuild it from stored payloads
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                limit=settings.QDRANT_UPSERT_BATCH_SIZE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            for point in points:
+                self.lexical_index.add(str(point.id), point.payload)
+            if offset is None:
+                break
+        CustomLogger.create_log(
+            "info", f"Loaded {len(self.lexical_index)} chunks into the lexical index"
+        )
 
-    def _recreate_collection(self):
+    async def _recreate_collection(self):
         try:
-            self.client.delete_collection(settings.QDRANT_COLLECTION_NAME)
+            await self.client.delete_collection(settings.QDRANT_COLLECTION_NAME)
             CustomLogger.create_log("info", "Deleted existing collection")
         except Exception:
             # Collection might not exist, which is fine
@@ -78,38 +149,398 @@ class QdrantDatabase:
             "info",
             f"Creating collection {settings.QDRANT_COLLECTION_NAME} in Qdrant",
         )
-        self.client.create_collection(
+        await self.client.create_collection(
             collection_name=settings.QDRANT_COLLECTION_NAME,
             # Dimension size is 768 since text-embedding-005 (model that we are using for embeddings) has 768 dimensions
             vectors_config=VectorParams(size=768, distance=Distance.COSINE),
         )
+        await self._ensure_payload_indexes()
+
+    async def add_document(
+        self,
+        text: str,
+        page_number: str,
+        blob_name: Optional[str],
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        return await self.add_pages([(text, page_number, blob_name, metadata)])
+
+    async def add_pages(self, pages: List[Tuple]) -> List[str]:
+        """Chunk (text, page_number, blob_name[, metadata]) pages and index
+        every chunk.
+
+        blob_name is the page image in the bucket; URLs are signed when the
+        page is served since a stored one would expire. The optional metadata
+        dict, such as the session and notebook IDs, is copied into every
+        chunk of its page, stamped with the current version of its notebook
+        and session. Pages carrying an older notebook_version are skipped,
+        and chunks whose session was reset while they were being embedded are
+        deleted again.
+        All chunks of all given pages go through one add_documents_bulk call.
+        """
+        documents = []
+        versions = {}
+        for text, page_number, blob_name, *extra in pages:
+            page_metadata = dict((extra[0] if extra else None) or {})
+            scope = version_scope(
+                page_metadata.get("notebook_id"), page_metadata.get("session_id")
+            )
+            if scope is not None:
+                version = self.notebook_version(scope)
+                if page_metadata.get("notebook_version") not in (None, version):
+                    # Captured before the session was reset
+                    continue
+                page_metadata["notebook_version"] = version
+                versions[scope] = version
+            # Integer copy of page_number for page range filters
+            page = int(page_number) if str(page_number).isdigit() else None
+            chunks = chunk_text(text)
+            for chunk in chunks:
+                documents.append(
+                    Document(
+                        page_content=chunk.text,
+                        metadata={
+                            **page_metadata,
+                            "page_number": page_number,
+                            "page": page,
+                            "blob_name": blob_name,
+                            "chunk_index": chunk.chunk_index,
+                            "chunk_count": len(chunks),
+                            "char_start": chunk.char_start,
+                            "char_end": chunk.char_end,
+                        },
+                    )
+                )
+        CustomLogger.create_log(
+            "info", f"Adding {len(documents)} chunks for {len(pages)} pages to Qdrant"
+        )
+        point_ids = await self.add_documents_bulk(documents)
+
+        # A reset during the upsert may already have been collected, which
+        # only deletes points upserted before it, so delete these here. Any
+        # reset after this check is collected after the upsert.
+        for scope, version in versions.items():
+            if self.notebook_version(scope) != version:
+                removed = await self._delete_stale_versions(scope)
+                CustomLogger.create_log(
+                    "warning",
+                    f"{scope} was reset while indexing, removed {removed} chunks",
+                )
+        return point_ids
+
+    async def add_documents_bulk(
+        self,
+        documents: List[Document],
+        batch_size: int = settings.QDRANT_UPSERT_BATCH_SIZE,
+        embedding_batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+        parallel: int = settings.QDRANT_UPSERT_PARALLEL,
+        wait: bool = False,
+    ) -> List[str]:
+        """Embed and upsert many documents, returning their point IDs.
+
+        Embeddings are computed in batches of embedding_batch_size and points
+        are upserted in batches of batch_size, with up to parallel batches of
+        each in flight. With wait=False Qdrant acknowledges a batch as soon as
+        it is queued rather than once it is indexed.
+        """
+        if not documents:
+            return []
+
+        semaphore = asyncio.Semaphore(parallel)
+
+        async def embed(batch: List[Document]) -> List[List[float]]:
+            async with semaphore:
+                return await self.embeddings.aembed_documents(
+                    [document.page_content for document in batch]
+                )
 
-    def add_document(self, text: str, page_number: str, image_path: str):
-        document = Document(
-            page_content=text,
-            metadata={"page_number": page_number, "image_path": image_path},
+        embedding_batches = await asyncio.gather(
+            *(
+                embed(documents[i : i + embedding_batch_size])
+                for i in range(0, len(documents), embedding_batch_size)
+            )
         )
+        embeddings = [vector for batch in embedding_batches for vector in batch]
+
+        # Dashed UUID strings, the form Qdrant returns, so lexical and dense
+        # results share IDs
+        point_ids = [str(uuid.uuid4()) for _ in documents]
+        # Same payload layout as langchain's QdrantVectorStore
+        payloads = [
+            {"page_content": document.page_content, "metadata": document.metadata}
+            for document in documents
+        ]
+
+        async def upsert(start: int):
+            end = start + batch_size
+            async with semaphore:
+                # Columnar batches are much cheaper to validate and send than
+                # one PointStruct per point
+                await self.client.upsert(
+                    collection_name=settings.QDRANT_COLLECTION_NAME,
+                    points=Batch(
+                        ids=point_ids[start:end],
+                        vectors=embeddings[start:end],
+                        payloads=payloads[start:end],
+                    ),
+                    wait=wait,
+                )
+
+        await asyncio.gather(
+            *(upsert(start) for start in range(0, len(documents), batch_size))
+        )
+        for point_id, payload in zip(point_ids, payloads):
+            self.lexical_index.add(point_id, payload)
+        self.collection_version += 1
+        CustomLogger.create_log("info", f"Upserted {len(point_ids)} points to Qdrant")
+        return point_ids
+
+    async def embed_query(self, query: str):
+        embedding = self.embedding_cache.get(query)
+        if embedding is None:
+            embedding = await self.embeddings.aembed_query(query)
+            self.embedding_cache.set(query, embedding)
+        return embedding
+
+    async def _dense_search(
+        self,
+        query: str,
+        limit: int,
+        search_filter: Optional[SearchFilter],
+        offset: int = 0,
+    ):
+        """(points, query_vector) for the dense ranking of query."""
+        query_vector = await self.embed_query(query)
+        response = await self.client.query_points(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            query=query_vector,
+            query_filter=search_filter.to_qdrant() if search_filter else None,
+            limit=limit,
+            offset=offset,
+            with_payload=True,
+        )
+        return response.points, query_vector
+
+    def _lexical_search(
+        self,
+        query: str,
+        k: int,
+        search_filter: Optional[SearchFilter],
+        offset: int = 0,
+    ) -> List[Document]:
+        processed_results = []
+        for hit in self.lexical_index.search(query, k, search_filter, offset):
+            payload = self.lexical_index.payload(hit.point_id)
+            if payload is None:
+                continue
+            metadata = payload["metadata"]
+            metadata["_id"] = hit.point_id
+            metadata["score"] = round(hit.coverage, 4)
+            metadata["retrieval"] = "lexical"
+            processed_results.append(
+                Document(page_content=payload["page_content"], metadata=metadata)
+            )
+        return processed_results
+
+    async def search(
+        self,
+        query,
+        k=2,
+        mode: Optional[str] = None,
+        search_filter: Optional[SearchFilter] = None,
+        offset: int = 0,
+    ):
+        documents, _ = await self.search_with_vector(
+            query, k=k, mode=mode, search_filter=search_filter, offset=offset
+        )
+        return documents
+
+    async def search_with_vector(
+        self,
+        query,
+        k=2,
+        mode: Optional[str] = None,
+        search_filter: Optional[SearchFilter] = None,
+        offset: int = 0,
+    ):
+        """Return the k best chunks for query after skipping the first offset,
+        with the query vector the dense search embedded.
+
+        search_filter restricts results to a notebook, session and/or page
+        range, using the payload indexes in Qdrant. mode is "dense" (Qdrant
+        vectors), "lexical" (the in-process BM25 index) or "hybrid", which
+        fuses both rankings with reciprocal rank fusion, and defaults to
+        settings.SEARCH_MODE. Dense and hybrid searches fall back to lexical
+        results when the embedding or Qdrant call fails or takes longer than
+        settings.SEARCH_DENSE_TIMEOUT_SECONDS.
+
+        The query vector is None when no embedding was computed, in lexical
+        mode or after falling back, so callers can reuse it without another
+        embedding call.
+        """
+        mode = mode or settings.SEARCH_MODE
+        if mode not in SEARCH_MODES:
+            raise ValueError(
+                f"Unknown search mode {mode}, expected one of {SEARCH_MODES}"
+            )
+        if self.retired:
+            search_filter = dataclasses.replace(
+                search_filter or SearchFilter(), retired=dict(self.retired)
+            )
+        if search_filter is not None and search_filter.is_empty():
+            search_filter = None
         CustomLogger.create_log(
-            "info", f"Adding document for page {page_number} to Qdrant"
+            "info", f"Searching ({mode}) for {query} with filter {search_filter}"
         )
-        self.vector_store.add_documents([document])
-        CustomLogger.create_log("info", "Document added to Qdrant")
 
-    def search(self, query, k=2):
-        CustomLogger.create_log("info", f"Searching for {query}")
-        results = self.vector_store.similarity_search_with_score(query, k=k)
+        if mode == "lexical":
+            return self._lexical_search(query, k, search_filter, offset), None
+
+        try:
+            if mode == "dense":
+                points, query_vector = await asyncio.wait_for(
+                    self._dense_search(query, k, search_filter, offset),
+                    timeout=settings.SEARCH_DENSE_TIMEOUT_SECONDS,
+                )
+            else:
+                # Fusion needs both rankings from the top, so page afterwards
+                limit = max(offset + k, settings.SEARCH_CANDIDATES)
+                points, query_vector = await asyncio.wait_for(
+                    self._dense_search(query, limit, search_filter),
+                    timeout=settings.SEARCH_DENSE_TIMEOUT_SECONDS,
+                )
+        except Exception as e:
+            CustomLogger.create_log(
+                "warning",
+                f"Dense search failed, answering from the lexical index: {str(e) or type(e).__name__}",
+            )
+            return self._lexical_search(query, k, search_filter, offset), None
+
+        if mode == "dense":
+            return [self._point_to_document(point) for point in points], query_vector
+
+        lexical_hits = self.lexical_index.search(query, limit, search_filter)
+        fused = defaultdict(float)
+        for ranking in (
+            [str(point.id) for point in points],
+            [hit.point_id for hit in lexical_hits],
+        ):
+            for rank, point_id in enumerate(ranking, start=1):
+                fused[point_id] += 1 / (RRF_K + rank)
+
+        dense_points = {str(point.id): point for point in points}
+        coverages = {hit.point_id: hit.coverage for hit in lexical_hits}
         processed_results = []
+        ranked = sorted(fused, key=fused.get, reverse=True)[offset : offset + k]
+        for point_id in ranked:
+            if point_id in dense_points:
+                document = self._point_to_document(dense_points[point_id])
+            else:
+                payload = self.lexical_index.payload(point_id)
+                if payload is None:
+                    continue
+                document = Document(
+                    page_content=payload["page_content"],
+                    metadata={
+                        **payload["metadata"],
+                        "_id": point_id,
+                        "score": round(coverages[point_id], 4),
+                    },
+                )
+            document.metadata["rrf_score"] = round(fused[point_id], 6)
+            if point_id in dense_points and point_id in coverages:
+                document.metadata["retrieval"] = "hybrid"
+            elif point_id not in dense_points:
+                document.metadata["retrieval"] = "lexical"
+            processed_results.append(document)
 
-        for doc, score in results:
-            doc.metadata["score"] = round(score, 4)
-            processed_results.append(doc)
+        return processed_results, query_vector
 
-        return processed_results
+    @staticmethod
+    def _point_to_document(point) -> Document:
+        metadata = point.payload.get("metadata") or {}
+        metadata["_id"] = str(point.id)
+        metadata["score"] = round(point.score, 4)
+        metadata["retrieval"] = "dense"
+        return Document(
+            page_content=point.payload.get("page_content", ""), metadata=metadata
+        )
 
-    def delete_all_documents(self):
-        self._recreate_collection()
-        self.vector_store = QdrantVectorStore(
-            client=self.client,
+    async def delete_matching(self, search_filter: SearchFilter) -> int:
+        """Delete every chunk matching search_filter, such as the chunks of
+        one scan session that is about to be re-indexed."""
+        if search_filter.is_empty():
+            raise ValueError("Refusing to delete with an empty filter")
+        await self.client.delete(
             collection_name=settings.QDRANT_COLLECTION_NAME,
-            embedding=self.embeddings,
+            points_selector=FilterSelector(filter=search_filter.to_qdrant()),
+            wait=True,
+        )
+        removed = self.lexical_index.remove_where(search_filter.matches)
+        self.collection_version += 1
+        CustomLogger.create_log(
+            "info", f"Deleted {removed} chunks matching {search_filter}"
         )
+        return removed
+
+    def notebook_version(self, scope: str) -> str:
+        """Current version of a version_scope(notebook_id, session_id)."""
+        return self.notebook_versions.setdefault(scope, uuid.uuid4().hex[:12])
+
+    def retire_notebook(self, scope: str, version: Optional[str] = None) -> str:
+        """Empty one session's pages of a notebook for searches in O(1),
+        returning the scope's new version.
+
+        Chunks already indexed keep their old version and disappear from
+        results at once; chunks added from now on get the new one. Chunks
+        other sessions indexed into the same notebook are untouched. The old
+        chunks stay in Qdrant until collect_notebook deletes them. version
+        restores a reset journaled before a restart.
+        """
+        version = version or uuid.uuid4().hex[:12]
+        self.notebook_versions[scope] = version
+        self.retired[scope] = version
+        self.collection_version += 1
+        return version
+
+    async def collect_notebook(self, scope: str) -> int:
+        """Delete the chunks of a retired scope that are not of its current
+        version, then stop filtering them out of searches."""
+        version = self.notebook_version(scope)
+        removed = await self._delete_stale_versions(scope, version)
+        # A reset made while deleting leaves the scope retired
+        if self.retired.get(scope) == version:
+            del self.retired[scope]
+        self.collection_version += 1
+        CustomLogger.create_log("info", f"Collected {removed} stale chunks of {scope}")
+        return removed
+
+    async def _delete_stale_versions(
+        self, scope: str, version: Optional[str] = None
+    ) -> int:
+        """Delete the chunks of scope not of version, by default its current
+        one, from Qdrant and the lexical index."""
+        versions = {scope: version or self.notebook_version(scope)}
+        await self.client.delete(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            points_selector=FilterSelector(
+                filter=stale_versions_filter(scope, versions[scope])
+            ),
+            # The search filter may only be lifted once the points are gone
+            wait=True,
+        )
+        removed = self.lexical_index.remove_where(
+            lambda metadata: is_stale(metadata, versions)
+        )
+        self.collection_version += 1
+        return removed
+
+    async def delete_all_documents(self):
+        await self._recreate_collection()
+        self.lexical_index.clear()
+        self.retired.clear()
+        self.collection_version += 1
+
+    async def close(self):
+        await self.client.close()
+        CustomLogger.create_log("info", "Closed Qdrant connection")
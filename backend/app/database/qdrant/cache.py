@@ -0,0 +1,52 @@
+# backend/app/database/qdrant/cache.py
+
+import threading
+from typing import Dict, List, Optional
+
+from cachetools import TTLCache
+
+
+class EmbeddingCache:
+    """Bounded LRU cache of query embeddings with per-entry TTL.
+
+    Keys are normalized query text, so the same question typed with different
+    casing or spacing reuses one embedding instead of another Vertex call.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.casefold().split())
+
+    def get(self, query: str) -> Optional[List[float]]:
+        key = self.normalize(query)
+        with self._lock:
+            embedding = self._cache.get(key)
+            if embedding is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return embedding
+
+    def set(self, query: str, embedding: List[float]):
+        with self._lock:
+            self._cache[self.normalize(query)] = embedding
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,113 @@
+# backend/app/database/qdrant/filters.py
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from qdrant_client.http.models import FieldCondition, Filter, MatchValue, Range
+
+
+def version_scope(notebook_id: Optional[str], session_id: Optional[str]):
+    """Key of the chunks one scan session indexed into one notebook, which a
+    reset retires together, or None unless both IDs are set. IDs never
+    contain "/", see SESSION_ID_PATTERN."""
+    if notebook_id is None or session_id is None:
+        return None
+    return f"{notebook_id}/{session_id}"
+
+
+def stale_versions_filter(scope: str, version: str) -> Filter:
+    """Chunks of a version scope with any version but the given one,
+    including chunks indexed before versions existed."""
+    notebook_id, session_id = scope.split("/")
+    return Filter(
+        must=[
+            FieldCondition(
+                key="metadata.notebook_id", match=MatchValue(value=notebook_id)
+            ),
+            FieldCondition(
+                key="metadata.session_id", match=MatchValue(value=session_id)
+            ),
+        ],
+        must_not=[
+            FieldCondition(
+                key="metadata.notebook_version", match=MatchValue(value=version)
+            )
+        ],
+    )
+
+
+@dataclass
+class SearchFilter:
+    """Restricts a search to one notebook, session and/or page range.
+
+    Page bounds are inclusive and apply to the integer "page" metadata field,
+    so chunks indexed without one never match a page range. retired maps
+    the version scopes being reset to the version that survives the reset;
+    chunks of those scopes with any other version are excluded.
+    """
+
+    notebook_id: Optional[str] = None
+    session_id: Optional[str] = None
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
+    retired: Dict[str, str] = field(default_factory=dict)
+
+    def is_empty(self) -> bool:
+        return (
+            self.notebook_id is None
+            and self.session_id is None
+            and self.page_from is None
+            and self.page_to is None
+            and not self.retired
+        )
+
+    def to_qdrant(self) -> Optional[Filter]:
+        conditions = [
+            FieldCondition(key=f"metadata.{key}", match=MatchValue(value=value))
+            for key, value in (
+                ("notebook_id", self.notebook_id),
+                ("session_id", self.session_id),
+            )
+            if value is not None
+        ]
+        if self.page_from is not None or self.page_to is not None:
+            conditions.append(
+                FieldCondition(
+                    key="metadata.page",
+                    range=Range(gte=self.page_from, lte=self.page_to),
+                )
+            )
+        excluded = [
+            stale_versions_filter(scope, version)
+            for scope, version in self.retired.items()
+        ]
+        if not conditions and not excluded:
+            return None
+        return Filter(must=conditions or None, must_not=excluded or None)
+
+    def matches(self, metadata: dict) -> bool:
+        if self.retired and is_stale(metadata, self.retired):
+            return False
+        if self.notebook_id is not None and (
+            metadata.get("notebook_id") != self.notebook_id
+        ):
+            return False
+        if self.session_id is not None and metadata.get("session_id") != (
+            self.session_id
+        ):
+            return False
+        if self.page_from is None and self.page_to is None:
+            return True
+        page = metadata.get("page")
+        if page is None:
+            return False
+        if self.page_from is not None and page < self.page_from:
+            return False
+        return self.page_to is None or page <= self.page_to
+
+
+def is_stale(metadata: dict, versions: Dict[str, str]) -> bool:
+    """Whether a chunk belongs to a version scope in versions with a version
+    other than the one given there, like stale_versions_filter."""
+    scope = version_scope(metadata.get("notebook_id"), metadata.get("session_id"))
+    return scope in versions and metadata.get("notebook_version") != versions[scope]
@@ -0,0 +1,170 @@
+# backend/app/database/qdrant/lexical.py
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional
+
+from app.database.qdrant.filters import SearchFilter
+
+# Words plus joined runs like "csc108", "x^2" or "e.g", so codes and formulas
+# stay one token
+TOKEN_PATTERN = re.compile(r"\w+(?:[.+\-^/]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+@dataclass
+class LexicalHit:
+    point_id: str
+    score: float
+    # Share of the query's IDF weight matched by the chunk, between 0 and 1
+    coverage: float
+
+
+class LexicalIndex:
+    """In-process BM25 inverted index over indexed chunks, keyed by point ID.
+
+    Chunks are added as they are upserted, so exact-term lookups never wait
+    on the embedding service. Payloads are kept alongside the postings so a
+    lexical-only search can answer without going to Qdrant.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._payloads: Dict[str, dict] = {}
+        self._total_length = 0
+        # BM25 length normalisation per chunk, rebuilt lazily after changes
+        self._norms: Optional[Dict[str, float]] = None
+
+    def add(self, point_id: str, payload: dict):
+        terms = Counter(tokenize(payload.get("page_content", "")))
+        with self._lock:
+            self._remove(point_id)
+            for term, frequency in terms.items():
+                self._postings[term][point_id] = frequency
+            self._terms[point_id] = terms
+            self._payloads[point_id] = payload
+            self._lengths[point_id] = sum(terms.values())
+            self._total_length += self._lengths[point_id]
+            self._norms = None
+
+    def remove(self, point_id: str):
+        with self._lock:
+            self._remove(point_id)
+
+    def _remove(self, point_id: str):
+        terms = self._terms.pop(point_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(point_id, None)
+            if not postings:
+                del self._postings[term]
+        self._payloads.pop(point_id, None)
+        self._total_length -= self._lengths.pop(point_id)
+        self._norms = None
+
+    def remove_where(self, predicate: Callable[[dict], bool]) -> int:
+        """Remove every chunk for which predicate(metadata) is true."""
+        with self._lock:
+            point_ids = [
+                point_id
+                for point_id, payload in self._payloads.items()
+                if predicate(payload.get("metadata") or {})
+            ]
+            for point_id in point_ids:
+                self._remove(point_id)
+        return len(point_ids)
+
+    def _matches(self, point_id: str, search_filter: SearchFilter) -> bool:
+        return search_filter.matches(self._payloads[point_id].get("metadata") or {})
+
+    def payload(self, point_id: str) -> Optional[dict]:
+        with self._lock:
+            payload = self._payloads.get(point_id)
+        if payload is None:
+            return None
+        # Callers annotate metadata with scores, which must not leak back in
+        return {**payload, "metadata": dict(payload.get("metadata") or {})}
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        search_filter: Optional[SearchFilter] = None,
+        offset: int = 0,
+    ) -> List[LexicalHit]:
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self._terms)
+            if not terms or not count:
+                return []
+            norms = self._length_norms()
+
+            scores: Dict[str, float] = defaultdict(float)
+            matched: Dict[str, float] = defaultdict(float)
+            total_idf = 0.0
+            for term in terms:
+                postings = self._postings.get(term, {})
+                frequency = len(postings)
+                idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+                total_idf += idf
+                weight = idf * (self.k1 + 1)
+                for point_id, term_frequency in postings.items():
+                    scores[point_id] += (
+                        weight * term_frequency / (term_frequency + norms[point_id])
+                    )
+                    matched[point_id] += idf
+
+            if search_filter is not None and not search_filter.is_empty():
+                scores = {
+                    point_id: score
+                    for point_id, score in scores.items()
+                    if self._matches(point_id, search_filter)
+                }
+
+        best = heapq.nlargest(offset + k, scores.items(), key=itemgetter(1))[offset:]
+        return [
+            LexicalHit(
+                point_id=point_id,
+                score=score,
+                coverage=matched[point_id] / total_idf if total_idf else 0.0,
+            )
+            for point_id, score in best
+        ]
+
+    def _length_norms(self) -> Dict[str, float]:
+        if self._norms is None:
+            average_length = self._total_length / len(self._lengths) or 1.0
+            base = self.k1 * (1 - self.b)
+            scale = self.k1 * self.b / average_length
+            self._norms = {
+                point_id: base + scale * length
+                for point_id, length in self._lengths.items()
+            }
+        return self._norms
+
+    def clear(self):
+        with self._lock:
+            self._postings = defaultdict(dict)
+            self._terms = {}
+            self._lengths = {}
+            self._payloads = {}
+            self._total_length = 0
+            self._norms = None
+
+    def __len__(self) -> int:
+        return len(self._terms)
@@ -1,5 +1,7 @@
 # backend/app/main.py
 
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,6 +9,7 @@ from fastapi.responses import JSONResponse
 
 from app.api.router import api_router
 from app.config import settings
+from app.services.ServiceContainer import ServiceContainer
 from app.utils.exception_handlers import register_exception_handlers
 from app.utils.logger import CustomLogger
 from app.utils.response import success_response
@@ -15,8 +18,18 @@ from app.websocket.router import websocket_router
 load_dotenv()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.services = ServiceContainer()
+    await app.state.services.start()
+    try:
+        yield
+    finally:
+        await app.state.services.close()
+
+
 def create_app() -> FastAPI:
-    app: FastAPI = FastAPI(title=settings.PROJECT_NAME)
+    app: FastAPI = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
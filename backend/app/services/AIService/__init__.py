@@ -1,27 +1,62 @@
 # backend/app/services/AIService/__init__.py
 
+import asyncio
+import re
+import time
+from typing import Optional
+
 from langchain_core.messages import HumanMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from app.config import settings
 from app.database.qdrant import QdrantDatabase
+from app.database.qdrant.filters import SearchFilter
+from app.services.AIService.cache import ResponseCache, context_hash
 from app.services.AIService.prompts import Prompts
+from app.services.OCRService.result import OCRResult
 from app.utils.ai import format_chat_history, format_documents
 from app.utils.logger import CustomLogger
 
+# Marks a paragraph to clean in the page sent to the LLM, e.g. [[3]]
+PARAGRAPH_MARKER = re.compile(r"^\[\[(\d+)\]\][ \t]*", re.MULTILINE)
+
 
 class AIService:
-    def __init__(self):
-        self.qdrant_db = QdrantDatabase()
+    def __init__(self, qdrant_db: QdrantDatabase):
+        self.qdrant_db = qdrant_db
         self.google_model = ChatGoogleGenerativeAI(
             model="gemini-2.0-flash", streaming=True, api_key=settings.GOOGLE_API_KEY
         )
         self.google_model_no_stream = ChatGoogleGenerativeAI(
             model="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY
         )
+        self.cleanup_counters = {
+            "pages": 0,
+            "pages_bypassed": 0,
+            "paragraphs": 0,
+            "paragraphs_cleaned": 0,
+        }
+        # Bounds cleanup calls across pages, e.g. a whole re-index batch
+        self.cleanup_semaphore = asyncio.Semaphore(settings.OCR_CLEANUP_CONCURRENCY)
+        self.response_cache = ResponseCache(
+            maxsize=settings.RESPONSE_CACHE_SIZE,
+            threshold=settings.RESPONSE_CACHE_THRESHOLD,
+        )
 
-    def get_documents(self, query):
-        return self.qdrant_db.search(query)
+    async def get_documents(
+        self, query, search_filter: Optional[SearchFilter] = None, k: int = 2
+    ):
+        documents, _ = await self.retrieve(query, search_filter, k)
+        return documents
+
+    async def retrieve(
+        self, query, search_filter: Optional[SearchFilter] = None, k: int = 2
+    ):
+        """(documents, query_vector) for query, where query_vector is None
+        when the search did not embed the query."""
+        return await self.qdrant_db.search_with_vector(
+            query, k=k, search_filter=search_filter
+        )
 
     async def cleanup_ocr_text(self, ocr_text: str) -> str:
         prompt_template = Prompts.get_ocr_text_cleanup_prompt()
@@ -30,6 +65,84 @@ class AIService:
         response = await self.google_model_no_stream.ainvoke(messages)
         return response.content
 
+    async def cleanup_ocr_result(
+        self,
+        ocr_result: OCRResult,
+        paragraph_threshold: float = settings.OCR_CLEANUP_PARAGRAPH_CONFIDENCE,
+        word_threshold: float = settings.OCR_CLEANUP_WORD_CONFIDENCE,
+    ) -> str:
+        """Clean only the paragraphs Vision was unsure about.
+
+        Confident paragraphs are kept as read, and a page without any uncertain
+        paragraph never reaches the LLM. The uncertain paragraphs of a page are
+        cleaned in one call, with the rest of the page as context, and at most
+        settings.OCR_CLEANUP_CONCURRENCY pages are cleaned at once.
+        """
+        indexes = ocr_result.low_confidence_paragraphs(
+            paragraph_threshold, word_threshold
+        )
+        self.cleanup_counters["pages"] += 1
+        self.cleanup_counters["paragraphs"] += len(ocr_result)
+        if len(indexes) == 0:
+            self.cleanup_counters["pages_bypassed"] += 1
+            return ocr_result.layout_text
+
+        paragraphs = list(ocr_result.paragraph_texts)
+        async with self.cleanup_semaphore:
+            cleaned = await self.cleanup_paragraphs(paragraphs, indexes.tolist())
+        for index, text in cleaned.items():
+            paragraphs[index] = text
+        self.cleanup_counters["paragraphs_cleaned"] += len(cleaned)
+        CustomLogger.create_log(
+            "info", f"Cleaned {len(cleaned)} of {len(ocr_result)} OCR paragraphs"
+        )
+        return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+
+    async def cleanup_paragraphs(self, paragraphs, indexes) -> dict:
+        """Cleaned text of the paragraphs at indexes, by index, from one LLM
+        call. A paragraph missing from the reply is left out, so the caller
+        keeps it as read."""
+        marked = set(indexes)
+        page_text = "\n\n".join(
+            f"[[{index}]] {text}" if index in marked else text
+            for index, text in enumerate(paragraphs)
+        )
+        prompt_template = Prompts.get_ocr_paragraph_cleanup_prompt()
+        formatted_prompt = prompt_template.format(page_text=page_text)
+        response = await self.google_model_no_stream.ainvoke(
+            [HumanMessage(content=formatted_prompt)]
+        )
+
+        # ["", "3", "text of 3", "7", "text of 7", ...]
+        parts = PARAGRAPH_MARKER.split(response.content)
+        cleaned = {}
+        for marker, text in zip(parts[1::2], parts[2::2]):
+            if int(marker) in marked and text.strip():
+                cleaned[int(marker)] = text.strip()
+        if len(cleaned) < len(marked):
+            CustomLogger.create_log(
+                "warning",
+                f"OCR cleanup returned {len(cleaned)} of {len(marked)} paragraphs,"
+                " keeping the others as read",
+            )
+        return cleaned
+
+    def cleanup_stats(self) -> dict:
+        counters = self.cleanup_counters
+        return {
+            **counters,
+            "bypass_rate": (
+                counters["pages_bypassed"] / counters["pages"]
+                if counters["pages"]
+                else 0.0
+            ),
+            "paragraph_cleanup_rate": (
+                counters["paragraphs_cleaned"] / counters["paragraphs"]
+                if counters["paragraphs"]
+                else 0.0
+            ),
+        }
+
     async def generate_response(self, query, history, documents):
         formatted_history = format_chat_history(history)
         formatted_docs = format_documents(documents)
@@ -44,7 +157,55 @@ class AIService:
         async for chunk in self.google_model.astream(messages):
             yield chunk.content
 
-    async def get_response(self, query, history):
-        documents = self.get_documents(query)
+    async def get_response(self, query, history, documents=None, query_vector=None):
+        """Stream the answer to query, from the response cache when a similar
+        query was answered from the same documents.
+
+        query_vector is the embedding retrieval computed for query. Without
+        one the cache is skipped, rather than paying for another embedding.
+        """
+        if documents is None:
+            documents, query_vector = await self.retrieve(query)
         CustomLogger.create_log("info", f"Retrieved {len(documents)} documents")
-        return self.generate_response(query, history, documents)
+
+        cache_key = self._response_cache_key(query_vector, history, documents)
+        if cache_key is not None:
+            cached = self.response_cache.get(*cache_key)
+            if cached is not None:
+                CustomLogger.create_log("info", "Answering from the response cache")
+                return self._replay_response(cached.chunks)
+        return self._generate_and_cache(query, history, documents, cache_key)
+
+    def _response_cache_key(self, query_vector, history, documents):
+        if query_vector is None:
+            CustomLogger.create_log(
+                "info", "Skipping the response cache, the query was not embedded"
+            )
+            return None
+        document_ids = [document.metadata.get("_id") for document in documents]
+        return (
+            query_vector,
+            document_ids,
+            context_hash(history),
+            self.qdrant_db.collection_version,
+        )
+
+    @staticmethod
+    async def _replay_response(chunks):
+        for chunk in chunks:
+            yield chunk
+
+    async def _generate_and_cache(self, query, history, documents, cache_key):
+        started = time.perf_counter()
+        chunks = []
+        async for chunk in self.generate_response(query, history, documents):
+            chunks.append(chunk)
+            yield chunk
+        # Only complete answers are cached; a client that disconnects early
+        # closes this generator before it gets here
+        if cache_key is not None:
+            self.response_cache.set(
+                *cache_key,
+                chunks=chunks,
+                generation_seconds=time.perf_counter() - started,
+            )
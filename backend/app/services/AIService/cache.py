@@ -0,0 +1,150 @@
+# backend/app/services/AIService/cache.py
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def context_hash(history: Optional[List[dict]]) -> str:
+    """Stable hash of the conversation history an answer was generated for."""
+    turns = [(turn.get("role"), turn.get("content")) for turn in history or []]
+    return hashlib.sha256(json.dumps(turns).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    chunks: List[str]
+    document_ids: Tuple[str, ...]
+    context_hash: str
+    # Wall time the original generation took, saved again by every hit
+    generation_seconds: float
+
+
+class ResponseCache:
+    """Semantic cache of generated answers, looked up by query embedding.
+
+    A stored answer is reused when a new query's embedding has cosine
+    similarity of at least threshold with the stored query, the same chunks
+    were retrieved and the conversation history hashes the same. Embeddings
+    live in one preallocated matrix, so a lookup is a single matrix-vector
+    product; the oldest entry is overwritten once the cache is full.
+
+    Every entry belongs to a collection version, and the whole cache is
+    dropped as soon as a lookup or store sees a newer version.
+    """
+
+    def __init__(self, maxsize: int, threshold: float):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._entries: List[Optional[CachedResponse]] = [None] * maxsize
+        self._next_slot = 0
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync_version(self, version: int):
+        if self._version != version:
+            if self._version is not None and any(self._entries):
+                self.invalidations += 1
+            self._entries = [None] * self.maxsize
+            self._next_slot = 0
+            if self._matrix is not None:
+                self._matrix[:] = 0
+            self._version = version
+
+    def get(
+        self,
+        embedding: Sequence[float],
+        document_ids: Sequence[str],
+        history_hash: str,
+        version: int,
+    ) -> Optional[CachedResponse]:
+        query = self._normalize(embedding)
+        document_ids = tuple(document_ids)
+        with self._lock:
+            self._sync_version(version)
+            if self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+
+            similarities = self._matrix @ query
+            # Best matching entry whose retrieval and history also agree
+            for slot in np.argsort(similarities)[::-1]:
+                if similarities[slot] < self.threshold:
+                    break
+                entry = self._entries[slot]
+                if (
+                    entry is not None
+                    and entry.document_ids == document_ids
+                    and entry.context_hash == history_hash
+                ):
+                    self.hits += 1
+                    self.saved_seconds += entry.generation_seconds
+                    return entry
+            self.misses += 1
+            return None
+
+    def set(
+        self,
+        embedding: Sequence[float],
+        document_ids: Sequence[str],
+        history_hash: str,
+        version: int,
+        chunks: List[str],
+        generation_seconds: float,
+    ):
+        query = self._normalize(embedding)
+        with self._lock:
+            if self._version is not None and version < self._version:
+                # The collection changed while this answer was generated
+                return
+            self._sync_version(version)
+            if self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+                self._matrix = np.zeros(
+                    (self.maxsize, query.shape[0]), dtype=np.float32
+                )
+                self._entries = [None] * self.maxsize
+                self._next_slot = 0
+
+            slot = self._next_slot
+            self._matrix[slot] = query
+            self._entries[slot] = CachedResponse(
+                chunks=chunks,
+                document_ids=tuple(document_ids),
+                context_hash=history_hash,
+                generation_seconds=generation_seconds,
+            )
+            self._next_slot = (slot + 1) % self.maxsize
+
+    def clear(self):
+        with self._lock:
+            self._entries = [None] * self.maxsize
+            self._next_slot = 0
+            if self._matrix is not None:
+                self._matrix[:] = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": sum(entry is not None for entry in self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
@@ -40,8 +40,19 @@ class Prompts:
         return ChatPromptTemplate.from_messages(
             [
                 SystemMessage(
-                    content="You are a OCR text cleanup assistant. You will be given OCR text to clean and format in a paragraph. You are looking for grammatical, spelling, and possible miss-translations in the content during OCR conversion. No new information should be added, and you should try to maintain the original content to the best of your ability."
+                    content="You are a OCR text cleanup assistant. You will be given OCR text to clean and format. Paragraphs in the OCR text are separated by blank lines; keep those paragraph breaks in your output. You are looking for grammatical, spelling, and possible miss-translations in the content during OCR conversion. No new information should be added, and you should try to maintain the original content to the best of your ability."
                 ),
                 ("human", "Here is the OCR text: {ocr_text}"),
             ]
         )
+
+    @staticmethod
+    def get_ocr_paragraph_cleanup_prompt():
+        return ChatPromptTemplate.from_messages(
+            [
+                SystemMessage(
+                    content="You are a OCR text cleanup assistant. You will be given the OCR text of a page, with paragraphs separated by blank lines. Some paragraphs start with a marker such as [[3]]; only those need cleaning, and the others are there as context. Fix grammatical, spelling, and possible miss-translations in the marked paragraphs during OCR conversion. No new information should be added, and you should try to maintain the original content to the best of your ability. Reply with the marked paragraphs only, in order, each on a new line starting with its own marker."
+                ),
+                ("human", "Here is the OCR page: {page_text}"),
+            ]
+        )
@@ -0,0 +1,214 @@
+# backend/app/services/CleanupService/__init__.py
+
+import asyncio
+import json
+import uuid
+from typing import Dict, Optional, Set, Tuple
+
+from app.config import settings
+from app.database.qdrant import QdrantDatabase
+from app.database.qdrant.filters import version_scope
+from app.services.ClickPictureService.epochs import (
+    live_prefixes,
+    new_epoch,
+    write_epoch,
+)
+from app.services.ScanSessionService import ScanSession
+from app.services.StorageService import StorageService
+from app.utils.logger import CustomLogger
+
+
+class CleanupService:
+    """Resets scan sessions in O(1) and deletes what they left behind later.
+
+    A reset retires the chunks the session indexed into its notebook, leaving
+    other sessions' chunks in the same notebook alone, and switches its
+    captures to a new epoch, which hides the old chunks and blobs at once.
+    One background worker then deletes the old chunks and the old capture
+    blobs in batches. Pending work is kept in a journal blob, written before
+    each reset and after each deleted batch, so a restart resumes it.
+    """
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        qdrant_db: QdrantDatabase,
+        journal_blob: str = settings.CLEANUP_JOURNAL_BLOB,
+        batch_size: int = settings.CLEANUP_DELETE_BATCH_SIZE,
+        retry_seconds: float = settings.CLEANUP_RETRY_SECONDS,
+    ):
+        self.storage_service = storage_service
+        self.qdrant_db = qdrant_db
+        self.journal_blob = journal_blob
+        self.batch_size = batch_size
+        self.retry_seconds = retry_seconds
+        # Version each retired scope keeps, by version_scope(notebook, session)
+        self._notebooks: Dict[str, str] = {}
+        # Epoch each reset capture root keeps and blobs deleted so far, by root
+        self._captures: Dict[str, dict] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[Tuple[str, str]] = set()
+        self._journal_lock: Optional[asyncio.Lock] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._chunks_removed = 0
+        self._blobs_deleted = 0
+        self._failures = 0
+
+    async def start(self):
+        # Created here so the queue binds to the running event loop
+        self._queue = asyncio.Queue()
+        self._journal_lock = asyncio.Lock()
+        await self._load_journal()
+        # Re-apply resets journaled before a restart, in case the process
+        # stopped between writing the journal and switching over
+        for scope, version in self._notebooks.items():
+            self.qdrant_db.retire_notebook(scope, version=version)
+            self._schedule(("notebook", scope))
+        for root, job in self._captures.items():
+            await asyncio.to_thread(
+                write_epoch, self.storage_service, root, job["epoch"]
+            )
+            self._schedule(("captures", root))
+        self._worker_task = asyncio.create_task(self._worker())
+        if self._queued:
+            CustomLogger.create_log(
+                "info", f"Resuming {len(self._queued)} cleanup jobs from the journal"
+            )
+
+    async def reset_session(self, session: ScanSession):
+        """Start a session's pages in its notebook and its captures over
+        without waiting for anything to be deleted."""
+        click_picture_service = session.click_picture_service
+        scope = version_scope(session.notebook_id, session.session_id)
+        version = uuid.uuid4().hex[:12]
+        epoch = new_epoch()
+        self._notebooks[scope] = version
+        job = self._captures.setdefault(click_picture_service.root, {"deleted": 0})
+        job["epoch"] = epoch
+        await self._persist()
+
+        self.qdrant_db.retire_notebook(scope, version=version)
+        await asyncio.to_thread(click_picture_service.start_over, epoch)
+        self._schedule(("notebook", scope))
+        self._schedule(("captures", click_picture_service.root))
+        CustomLogger.create_log(
+            "info",
+            f"Reset session {session.session_id}, old pages are deleted in the background",
+        )
+
+    def stats(self) -> dict:
+        return {
+            "pending_notebooks": len(self._notebooks),
+            "pending_capture_roots": len(self._captures),
+            "queued": len(self._queued),
+            "chunks_removed": self._chunks_removed,
+            "blobs_deleted": self._blobs_deleted,
+            "failures": self._failures,
+        }
+
+    async def close(self):
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            await asyncio.gather(self._worker_task, return_exceptions=True)
+            self._worker_task = None
+
+    def _schedule(self, key: Tuple[str, str]):
+        if key not in self._queued:
+            self._queued.add(key)
+            self._queue.put_nowait(key)
+
+    async def _worker(self):
+        while True:
+            key = await self._queue.get()
+            # A reset made while this job runs queues it again
+            self._queued.discard(key)
+            kind, target = key
+            try:
+                if kind == "notebook":
+                    await self._collect_notebook(target)
+                else:
+                    await self._collect_captures(target)
+            except Exception as e:
+                self._failures += 1
+                CustomLogger.create_log(
+                    "error",
+                    f"Cleanup of {kind} {target} failed, retrying in {self.retry_seconds}s: {str(e)}",
+                )
+                asyncio.get_running_loop().call_later(
+                    self.retry_seconds, self._schedule, key
+                )
+
+    async def _collect_notebook(self, scope: str):
+        version = self._notebooks.get(scope)
+        if version is None:
+            return
+        self._chunks_removed += await self.qdrant_db.collect_notebook(scope)
+        if self._notebooks.get(scope) == version:
+            del self._notebooks[scope]
+            await self._persist()
+
+    async def _collect_captures(self, root: str):
+        job = self._captures.get(root)
+        if job is None:
+            return
+        result = await self.storage_service.alist_files(prefix=root)
+        if not result["success"]:
+            raise Exception(result["error"])
+        # Read after listing, so captures of an epoch started meanwhile are kept
+        epoch = job["epoch"]
+        keep = tuple(live_prefixes(root, epoch))
+
+        stale = [name for name in result["files"] if not name.startswith(keep)]
+        for start in range(0, len(stale), self.batch_size):
+            batch = stale[start : start + self.batch_size]
+            result = await self.storage_service.adelete_files(batch)
+            if not result["success"]:
+                raise Exception(result["error"])
+            job["deleted"] += len(batch)
+            self._blobs_deleted += len(batch)
+            await self._persist()
+            CustomLogger.create_log(
+                "info",
+                f"Deleted {start + len(batch)}/{len(stale)} old captures under {root}",
+            )
+
+        if job["epoch"] == epoch:
+            del self._captures[root]
+            await self._persist()
+
+    async def _load_journal(self):
+        result = await self.storage_service.adownload_bytes(self.journal_blob)
+        if not result["success"]:
+            return
+        try:
+            payload = json.loads(result["data"])
+            # Journals from before resets were scoped to a session name
+            # whole notebooks, which would reset other sessions' pages
+            self._notebooks = {
+                scope: version
+                for scope, version in payload["notebooks"].items()
+                if "/" in scope
+            }
+            self._captures = {
+                root: dict(job) for root, job in payload["captures"].items()
+            }
+        except Exception as e:
+            CustomLogger.create_log(
+                "warning", f"Ignoring unreadable cleanup journal: {str(e)}"
+            )
+
+    async def _persist(self):
+        async with self._journal_lock:
+            payload = json.dumps(
+                {"notebooks": self._notebooks, "captures": self._captures}
+            )
+            result = await self.storage_service.aupload_bytes(
+                payload.encode("utf-8"),
+                self.journal_blob,
+                content_type="application/json",
+                sign_url=False,
+            )
+        if not result["success"]:
+            CustomLogger.create_log(
+                "warning", f"Failed to persist cleanup journal: {result['error']}"
+            )
@@ -1,106 +1,183 @@
 # backend/app/services/ClickPictureService/__init__.py
 
-import os
-import time
+import threading
+from typing import Optional
 
 import cv2
 
-from app.services.GCPBucketService import GCPBucketService
+from app.config import settings
+from app.services.ClickPictureService.epochs import (
+    epoch_prefix,
+    read_epoch,
+    write_epoch,
+)
+from app.services.ClickPictureService.grabber import FrameGrabber
+from app.services.ClickPictureService.manifest import CaptureManifest
+from app.services.StorageService import StorageService
+from app.utils.image import closest_hash, phash
 from app.utils.logger import CustomLogger
 
 
 class ClickPictureService:
-    def __init__(self, bucket_name: str):
+    def __init__(
+        self,
+        storage_service: StorageService,
+        prefix: str = "captures/",
+        camera_index: Optional[int] = None,
+    ):
         self.camera = None
-        self.bucket_service = GCPBucketService(bucket_name)
-        self.temp_dir = "temp_captures"
-        os.makedirs(self.temp_dir, exist_ok=True)
+        self.grabber: Optional[FrameGrabber] = None
+        self.storage_service = storage_service
+        # Captures go to the epoch named by the HEAD blob under root, so
+        # starting over only switches epochs; see start_over
+        self.root = prefix
+        # None keeps the old behaviour of trying index 1, then index 0
+        self.camera_index = camera_index
+        self._lock = threading.Lock()
+        self._prefix: Optional[str] = None
+        self._manifest: Optional[CaptureManifest] = None
+
+    @property
+    def prefix(self) -> str:
+        self._ensure_epoch()
+        return self._prefix
+
+    @property
+    def manifest(self) -> CaptureManifest:
+        self._ensure_epoch()
+        return self._manifest
+
+    def _ensure_epoch(self):
+        with self._lock:
+            if self._prefix is None:
+                self._prefix = epoch_prefix(
+                    self.root, read_epoch(self.storage_service, self.root)
+                )
+                self._manifest = CaptureManifest(
+                    self.storage_service, prefix=self._prefix
+                )
+
+    def start_over(self, epoch: str):
+        """Send captures to a new, empty epoch under root in O(1).
+
+        Earlier epochs are left in storage for the CleanupService to delete.
+        """
+        write_epoch(self.storage_service, self.root, epoch)
+        with self._lock:
+            if self._manifest is not None:
+                # Its prefix is about to be deleted
+                self._manifest.discard()
+            self._prefix = epoch_prefix(self.root, epoch)
+            self._manifest = CaptureManifest(self.storage_service, prefix=self._prefix)
+            # Nothing to list or load in a prefix that was just made up
+            self._manifest.reset()
 
     def initialize_camera(self):
         try:
             if self.camera is not None and self.camera.isOpened():
                 return True
 
-            self.camera = cv2.VideoCapture(1)
-            if not self.camera.isOpened():
-                self.camera = cv2.VideoCapture(0)
-                CustomLogger.log(
-                    "INFO",
-                    "Could not open camera on index 1, trying index 0",
-                )
+            if self.camera_index is not None:
+                self.camera = cv2.VideoCapture(self.camera_index)
                 if not self.camera.isOpened():
-                    raise Exception("Could not open camera")
+                    raise Exception(
+                        f"Could not open camera on index {self.camera_index}"
+                    )
+            else:
+                self.camera = cv2.VideoCapture(1)
+                if not self.camera.isOpened():
+                    self.camera = cv2.VideoCapture(0)
+                    CustomLogger.create_log(
+                        "info",
+                        "Could not open camera on index 1, trying index 0",
+                    )
+                    if not self.camera.isOpened():
+                        raise Exception("Could not open camera")
+
+            self.grabber = FrameGrabber(self.camera)
+            self.grabber.start()
             return True
         except Exception as e:
-            print(f"Error initializing camera: {str(e)}")
+            CustomLogger.create_log("error", f"Error initializing camera: {str(e)}")
             return False
 
-    def delete_captures(self):
-        try:
-            # List all captures in the bucket
-            result = self.bucket_service.list_files(prefix="captures/")
-            if not result["success"]:
-                return result
-
-            # Delete each capture
-            for file_name in result["files"]:
-                delete_result = self.bucket_service.delete_file(file_name)
-                if not delete_result["success"]:
-                    return delete_result
-
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+    def wait_for_settle(self) -> bool:
+        """Block until the camera sees a still scene, e.g. a page that has
+        finished turning. Returns False on timeout."""
+        if self.grabber is None:
+            raise Exception("Camera is not initialized")
+        return self.grabber.wait_until_still()
 
-    def capture_picture(self):
+    def capture_picture(self, newest: Optional[int] = None):
+        """Capture, deduplicate and upload a page. newest restricts the
+        sharpest-frame choice to the latest frames, see FrameGrabber."""
         try:
-            if self.camera is None or not self.camera.isOpened():
+            if self.grabber is None or not self.camera.isOpened():
                 raise Exception("Camera is not initialized")
 
-            ret, frame = self.camera.read()
-            if not ret:
+            # The page may still be settling, so take the sharpest recent frame
+            sharpest = self.grabber.sharpest_frame(newest=newest)
+            if sharpest is None:
                 raise Exception("Failed to capture frame")
 
-            frame = cv2.flip(frame, 0)
-            frame = cv2.flip(frame, 1)
-
-            # List existing captures to determine next number
-            result = self.bucket_service.list_files(prefix="captures/capture_")
-            if not result["success"]:
-                return result
+            # The camera is mounted upside down; one pass flips both axes
+            frame = cv2.flip(sharpest[0], -1)
 
-            existing_captures = [
-                f
-                for f in result["files"]
-                if f.startswith("captures/capture_") and f.endswith(".jpg")
+            # A page the flipper failed to turn looks the same as a recent one
+            image_hash = phash(frame, settings.DUPLICATE_HASH_SIZE)
+            recent = [
+                (page_number, recent_hash)
+                for page_number, recent_hash in self.manifest.recent_hashes(
+                    settings.DUPLICATE_HASH_WINDOW
+                )
+                if len(recent_hash) == len(image_hash)
             ]
-            next_number = 1
-            if existing_captures:
-                numbers = [
-                    int(f.split("_")[1].split(".")[0]) for f in existing_captures
-                ]
-                next_number = max(numbers) + 1
-
-            # Save temporarily to local file
-            temp_filename = f"capture_{next_number}.jpg"
-            temp_file_path = os.path.join(self.temp_dir, temp_filename)
-            cv2.imwrite(temp_file_path, frame)
-
-            # Upload to GCS
-            gcs_filename = f"captures/{temp_filename}"
-            upload_result = self.bucket_service.upload_file(
-                temp_file_path, gcs_filename
+            closest = closest_hash(image_hash, recent)
+            if closest is not None and closest[1] <= settings.DUPLICATE_HASH_THRESHOLD:
+                return {
+                    "success": True,
+                    "duplicate": True,
+                    "duplicate_of": closest[0],
+                    "distance": closest[1],
+                }
+
+            next_number = self.manifest.allocate_page()
+
+            # Encode once in memory; the same bytes go to storage and to OCR
+            encoded, buffer = cv2.imencode(".jpg", frame)
+            if not encoded:
+                raise Exception("Failed to encode frame")
+            image_bytes = buffer.tobytes()
+
+            gcs_filename = f"{self.prefix}capture_{next_number}.jpg"
+            # Only the blob name is kept; URLs are signed when pages are served
+            upload_result = self.storage_service.upload_bytes(
+                image_bytes, gcs_filename, content_type="image/jpeg", sign_url=False
             )
-
-            # Clean up temporary file
-            os.remove(temp_file_path)
+            if upload_result["success"]:
+                self.manifest.record(
+                    next_number, gcs_filename, len(image_bytes), image_hash
+                )
+                upload_result["duplicate"] = False
+                upload_result["page_number"] = str(next_number)
+                upload_result["image_bytes"] = image_bytes
 
             return upload_result
 
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    def close(self):
+        """Release the camera and write the final capture manifest."""
+        self.release_camera()
+        if self._manifest is not None:
+            self._manifest.close()
+
     def release_camera(self):
+        # Stop reading before the camera goes away under the grabber thread
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.grabber = None
         if self.camera is not None:
             self.camera.release()
             self.camera = None
@@ -0,0 +1,113 @@
+# backend/app/services/ClickPictureService/derivatives.py
+
+import asyncio
+import re
+from typing import Dict
+
+import numpy as np
+
+from app.config import settings
+from app.services.StorageService import StorageService
+from app.utils.image import decode_image, encode_image, resize_to_width
+from app.utils.logger import CustomLogger
+
+# Sizes served by /api/images besides the original capture
+DERIVATIVE_SIZES = ("thumbnail", "preview")
+CONTENT_TYPES = {"webp": "image/webp", "jpg": "image/jpeg"}
+DERIVATIVE_NAME_PATTERN = re.compile(
+    rf"\.({'|'.join(DERIVATIVE_SIZES)})\.({'|'.join(CONTENT_TYPES)})$"
+)
+
+
+def derivative_widths() -> Dict[str, int]:
+    return {
+        "thumbnail": settings.IMAGE_THUMBNAIL_WIDTH,
+        "preview": settings.IMAGE_PREVIEW_WIDTH,
+    }
+
+
+def derivative_blob_name(
+    blob_name: str, size: str, image_format: str = settings.IMAGE_DERIVATIVE_FORMAT
+) -> str:
+    """Blob next to the original, e.g. capture_3.jpg -> capture_3.thumbnail.webp.
+
+    The suffix keeps derivatives out of CAPTURE_NAME_PATTERN. With
+    IMAGE_DERIVATIVE_FORMAT="jpg" they still end in .jpg, so listings of
+    page images skip them with is_derivative.
+    """
+    stem = blob_name.rsplit(".", 1)[0]
+    return f"{stem}.{size}.{image_format}"
+
+
+def is_derivative(name: str) -> bool:
+    """Whether name is a downscaled copy made by derivative_blob_name."""
+    return DERIVATIVE_NAME_PATTERN.search(name) is not None
+
+
+def make_derivatives(
+    frame: np.ndarray,
+    image_format: str = settings.IMAGE_DERIVATIVE_FORMAT,
+    quality: int = settings.IMAGE_DERIVATIVE_QUALITY,
+) -> Dict[str, bytes]:
+    """Encode a downscaled copy of frame for every derivative size.
+
+    Sizes are made largest first, each resized from the previous one, so only
+    the first resize reads the full resolution frame.
+    """
+    derivatives = {}
+    source = frame
+    for size, width in sorted(
+        derivative_widths().items(), key=lambda item: item[1], reverse=True
+    ):
+        source = resize_to_width(source, width)
+        derivatives[size] = encode_image(source, image_format, quality)
+    return derivatives
+
+
+async def store_derivatives(
+    storage_service: StorageService,
+    image_bytes: bytes,
+    blob_name: str,
+    image_format: str = settings.IMAGE_DERIVATIVE_FORMAT,
+) -> Dict[str, str]:
+    """Make the derivatives of a capture from its JPEG and upload them
+    concurrently, returning the blob name of each one stored.
+
+    A failed derivative is logged and skipped; the original is served in its
+    place.
+    """
+    try:
+        derivatives = await asyncio.to_thread(
+            lambda: make_derivatives(decode_image(image_bytes), image_format)
+        )
+    except Exception as e:
+        CustomLogger.create_log(
+            "warning", f"Failed to make derivatives of {blob_name}: {str(e)}"
+        )
+        return {}
+
+    names = {
+        size: derivative_blob_name(blob_name, size, image_format)
+        for size in derivatives
+    }
+    results = await asyncio.gather(
+        *(
+            storage_service.aupload_bytes(
+                data,
+                names[size],
+                content_type=CONTENT_TYPES[image_format],
+                sign_url=False,
+            )
+            for size, data in derivatives.items()
+        )
+    )
+    stored = {}
+    for size, result in zip(derivatives, results):
+        if result["success"]:
+            stored[size] = names[size]
+        else:
+            CustomLogger.create_log(
+                "warning",
+                f"Failed to upload {size} of {blob_name}: {result['error']}",
+            )
+    return stored
@@ -0,0 +1,41 @@
+# backend/app/services/ClickPictureService/epochs.py
+
+import uuid
+from typing import List, Optional
+
+from app.services.StorageService import StorageService
+
+# Blob under a session's capture root naming the epoch captures go to
+HEAD_BLOB = "HEAD"
+
+
+def new_epoch() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def epoch_prefix(root: str, epoch: Optional[str]) -> str:
+    # Sessions captured before epochs existed keep writing to the root
+    return f"{root}{epoch}/" if epoch else root
+
+
+def live_prefixes(root: str, epoch: str) -> List[str]:
+    """Blob name prefixes under root that a reset to epoch keeps."""
+    return [epoch_prefix(root, epoch), f"{root}{HEAD_BLOB}"]
+
+
+def read_epoch(storage_service: StorageService, root: str) -> Optional[str]:
+    result = storage_service.download_bytes(f"{root}{HEAD_BLOB}")
+    if not result["success"]:
+        return None
+    return result["data"].decode("utf-8").strip() or None
+
+
+def write_epoch(storage_service: StorageService, root: str, epoch: str):
+    result = storage_service.upload_bytes(
+        epoch.encode("utf-8"),
+        f"{root}{HEAD_BLOB}",
+        content_type="text/plain",
+        sign_url=False,
+    )
+    if not result["success"]:
+        raise Exception(f"Failed to switch {root} to epoch {epoch}: {result['error']}")
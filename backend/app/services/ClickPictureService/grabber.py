@@ -0,0 +1,156 @@
+# backend/app/services/ClickPictureService/grabber.py
+
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.config import settings
+from app.utils.image import frame_difference, sharpness, to_gray
+from app.utils.logger import CustomLogger
+
+# Pause after a failed read, so a camera that went away does not spin a core
+READ_RETRY_SECONDS = 0.05
+
+
+class FrameGrabber:
+    """Reads an opened camera continuously on a background thread.
+
+    Reading as fast as the camera delivers keeps the driver's buffer drained,
+    so buffered frames are never more than a frame interval old. The last
+    buffer_size frames are kept in a ring buffer, and a capture takes the
+    sharpest of them instead of whatever single frame read() returns.
+    Frames are numbered as they arrive, so callers can also follow the
+    stream frame by frame, as wait_until_still does.
+    """
+
+    def __init__(
+        self,
+        camera: cv2.VideoCapture,
+        buffer_size: int = settings.CAMERA_FRAME_BUFFER_SIZE,
+    ):
+        self.camera = camera
+        self._frames = deque(maxlen=buffer_size)
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        # Number of the newest frame, counting from 1
+        self._sequence = 0
+        self.read_failures = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="frame-grabber", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            # read() returns within a frame interval, so this is short
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._condition:
+            self._frames.clear()
+            self._condition.notify_all()
+
+    def _run(self):
+        while self._running:
+            ret, frame = self.camera.read()
+            if not ret:
+                self.read_failures += 1
+                time.sleep(READ_RETRY_SECONDS)
+                continue
+            with self._condition:
+                self._frames.append(frame)
+                self._sequence += 1
+                self._condition.notify_all()
+
+    @property
+    def sequence(self) -> int:
+        with self._condition:
+            return self._sequence
+
+    def next_frame(
+        self, after: int, timeout: float
+    ) -> Optional[Tuple[int, np.ndarray]]:
+        """(sequence, frame) of the newest frame numbered above after, waiting
+        up to timeout for one. Frames in between are skipped when the caller
+        is slower than the camera."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._sequence > after or not self._running, timeout
+            )
+            if self._sequence <= after or not self._frames:
+                return None
+            return self._sequence, self._frames[-1]
+
+    def wait_until_still(
+        self,
+        frames: int = settings.CAMERA_SETTLE_FRAMES,
+        threshold: float = settings.CAMERA_SETTLE_THRESHOLD,
+        width: int = settings.CAMERA_SETTLE_WIDTH,
+        timeout: float = settings.CAMERA_SETTLE_TIMEOUT_SECONDS,
+    ) -> bool:
+        """Wait until frames new frames in a row each differ from the one
+        before by at most threshold, or timeout passes.
+
+        Frames are compared as small grayscale copies, where sensor noise
+        averages out but a moving page still changes many pixels. Returns
+        whether the scene settled.
+        """
+        deadline = time.monotonic() + timeout
+        sequence = self.sequence
+        previous = None
+        still = 0
+        while still < frames:
+            grabbed = self.next_frame(sequence, deadline - time.monotonic())
+            if grabbed is None:
+                return False
+            sequence, frame = grabbed
+            current = to_gray(frame, width)
+            if previous is not None:
+                moved = frame_difference(previous, current) > threshold
+                still = 0 if moved else still + 1
+            previous = current
+        return True
+
+    def frames(
+        self, timeout: float = settings.CAMERA_FRAME_TIMEOUT_SECONDS
+    ) -> List[np.ndarray]:
+        """The buffered frames, oldest first, waiting up to timeout for the
+        first one after the camera was opened. Empty if none arrived."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._frames or not self._running, timeout)
+            return list(self._frames)
+
+    def sharpest_frame(
+        self,
+        width: int = settings.CAMERA_SHARPNESS_WIDTH,
+        newest: Optional[int] = None,
+    ) -> Optional[Tuple[np.ndarray, float]]:
+        """(frame, sharpness) of the sharpest buffered frame, or None.
+
+        newest limits the choice to that many of the latest frames, e.g. to
+        those seen after the scene settled.
+        """
+        frames = self.frames()
+        if newest is not None:
+            frames = frames[-newest:]
+        if not frames:
+            return None
+        scores = [sharpness(frame, width) for frame in frames]
+        best = int(np.argmax(scores))
+        if best != len(frames) - 1:
+            CustomLogger.create_log(
+                "info",
+                f"Picked frame {best + 1}/{len(frames)}, sharpness {scores[best]:.0f}"
+                f" vs {scores[-1]:.0f} for the newest",
+            )
+        return frames[best], scores[best]
@@ -0,0 +1,233 @@
+# backend/app/services/ClickPictureService/manifest.py
+
+import json
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.StorageService import StorageService
+from app.utils.logger import CustomLogger
+
+CAPTURE_NAME_PATTERN = re.compile(r"capture_(\d+)\.jpg$")
+
+
+@dataclass
+class CaptureEntry:
+    page_number: int
+    blob_name: str
+    size: int
+    created_at: float
+    # Perceptual hash of the frame, used to spot pages that were not flipped
+    image_hash: Optional[str] = None
+
+
+class CaptureManifest:
+    """Hands out page numbers for a capture prefix and remembers what was uploaded.
+
+    Page numbers come from an in-memory counter. The bucket is listed only
+    when no manifest has been persisted yet (cold start on an old prefix), or
+    when the persisted one was not closed and may miss the last captures.
+
+    Captures are recorded in memory and written out by a timer at most every
+    flush_seconds, so a click never uploads the whole manifest; close()
+    writes the final copy at the end of the session.
+    """
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        prefix: str = "captures/",
+        flush_seconds: float = settings.MANIFEST_FLUSH_SECONDS,
+    ):
+        self.storage_service = storage_service
+        self.prefix = prefix
+        self.blob_name = f"{prefix}manifest.json"
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        # Serializes uploads, so an older copy never overwrites a newer one
+        self._flush_lock = threading.Lock()
+        self._loaded = False
+        self._next_page = 1
+        self._entries: Dict[int, CaptureEntry] = {}
+        # Changes not written yet, and whether the stored copy is closed
+        self._dirty = False
+        self._closed_copy = False
+        self._timer: Optional[threading.Timer] = None
+
+    def allocate_page(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            page_number = self._next_page
+            self._next_page += 1
+            return page_number
+
+    def record(
+        self,
+        page_number: int,
+        blob_name: str,
+        size: int,
+        image_hash: Optional[str] = None,
+    ):
+        with self._lock:
+            self._ensure_loaded()
+            self._entries[page_number] = CaptureEntry(
+                page_number=page_number,
+                blob_name=blob_name,
+                size=size,
+                created_at=time.time(),
+                image_hash=image_hash,
+            )
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def entries(self) -> List[CaptureEntry]:
+        with self._lock:
+            self._ensure_loaded()
+            return [self._entries[number] for number in sorted(self._entries)]
+
+    def get(self, page_number: int) -> Optional[CaptureEntry]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._entries.get(page_number)
+
+    def recent_hashes(self, count: int) -> List[Tuple[str, str]]:
+        """(page_number, image_hash) of the last count hashed pages."""
+        with self._lock:
+            self._ensure_loaded()
+            hashed = [
+                (str(number), self._entries[number].image_hash)
+                for number in sorted(self._entries)
+                if self._entries[number].image_hash
+            ]
+            return hashed[-count:]
+
+    def reset(self):
+        # Called for a prefix that is empty, so there is nothing to rebuild
+        with self._lock:
+            self._entries = {}
+            self._next_page = 1
+            self._loaded = True
+
+    def flush(self, close: bool = False):
+        """Upload the manifest if it changed since the last upload. With
+        close, also mark the stored copy as complete."""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._loaded or not (
+                    self._dirty or (close and not self._closed_copy)
+                ):
+                    return
+                payload = self._payload(closed=close)
+                self._dirty = False
+            if self._persist(payload):
+                self._closed_copy = close
+            else:
+                with self._lock:
+                    self._dirty = True
+
+    def close(self):
+        self.flush(close=True)
+
+    def discard(self):
+        """Drop pending changes, for a manifest whose prefix is abandoned."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._dirty = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        if not self._load_persisted():
+            self._rebuild_from_listing()
+        self._loaded = True
+
+    def _load_persisted(self) -> bool:
+        result = self.storage_service.download_bytes(self.blob_name)
+        if not result["success"]:
+            return False
+
+        try:
+            payload = json.loads(result["data"])
+            self._entries = {
+                entry["page_number"]: CaptureEntry(**entry)
+                for entry in payload["entries"]
+            }
+            self._next_page = payload["next_page"]
+            # Manifests from before flushing was deferred are always complete
+            self._closed_copy = payload.get("closed", True)
+            CustomLogger.create_log(
+                "info", f"Loaded capture manifest with {len(self._entries)} pages"
+            )
+        except Exception as e:
+            CustomLogger.create_log(
+                "warning", f"Ignoring unreadable capture manifest: {str(e)}"
+            )
+            return False
+
+        if not self._closed_copy:
+            # Captures after the last flush are only in the listing
+            entries, next_page = self._entries, self._next_page
+            self._rebuild_from_listing()
+            for number, entry in self._entries.items():
+                if number in entries:
+                    entry.image_hash = entries[number].image_hash
+            self._next_page = max(self._next_page, next_page)
+        return True
+
+    def _rebuild_from_listing(self):
+        result = self.storage_service.list_file_details(prefix=self.prefix)
+        if not result["success"]:
+            raise Exception(f"Failed to rebuild capture manifest: {result['error']}")
+
+        self._entries = {}
+        for file in result["files"]:
+            match = CAPTURE_NAME_PATTERN.search(file["name"])
+            if match is None:
+                continue
+            page_number = int(match.group(1))
+            self._entries[page_number] = CaptureEntry(
+                page_number=page_number,
+                blob_name=file["name"],
+                size=file["size"],
+                created_at=file["updated"],
+            )
+        self._next_page = max(self._entries, default=0) + 1
+        CustomLogger.create_log(
+            "info",
+            f"Rebuilt capture manifest from {len(self._entries)} existing captures",
+        )
+
+    def _payload(self, closed: bool) -> str:
+        return json.dumps(
+            {
+                "next_page": self._next_page,
+                "closed": closed,
+                "entries": [
+                    asdict(self._entries[number]) for number in sorted(self._entries)
+                ],
+            }
+        )
+
+    def _persist(self, payload: str) -> bool:
+        result = self.storage_service.upload_bytes(
+            payload.encode("utf-8"),
+            self.blob_name,
+            content_type="application/json",
+            sign_url=False,
+        )
+        if not result["success"]:
+            CustomLogger.create_log(
+                "warning", f"Failed to persist capture manifest: {result['error']}"
+            )
+        return result["success"]
@@ -0,0 +1,319 @@
+# backend/app/services/IngestionService/__init__.py
+
+import asyncio
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from fastapi import WebSocket
+
+from app.config import settings
+from app.database.qdrant import QdrantDatabase
+from app.database.qdrant.filters import SearchFilter
+from app.services.AIService import AIService
+from app.services.ClickPictureService.derivatives import store_derivatives
+from app.services.ClickPictureService.manifest import CAPTURE_NAME_PATTERN
+from app.services.OCRService import OCRService
+from app.services.StorageService import StorageService
+from app.services.WebSocketService import WebSocketService
+from app.utils.logger import CustomLogger
+
+
+@dataclass
+class IngestionJob:
+    page_number: str
+    # Stored with the chunks instead of a URL, which would expire
+    blob_name: str
+    # Encoded JPEG from the capture, so OCR never re-downloads the upload
+    image_bytes: Optional[bytes] = None
+    # Camera connection that captured the page, notified when the page is done
+    websocket: Optional[WebSocket] = None
+    session_id: Optional[str] = None
+    notebook_id: Optional[str] = None
+    # Notebook version at capture time, so a page still in the pipeline when
+    # its notebook is reset is not indexed into the new one
+    notebook_version: Optional[str] = None
+    # Blob name of each downscaled copy stored, by size; made by the worker
+    # from image_bytes when empty
+    derivatives: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def metadata(self) -> dict:
+        # Stored with every chunk of the page
+        return {
+            "session_id": self.session_id,
+            "notebook_id": self.notebook_id,
+            "notebook_version": self.notebook_version,
+            "derivatives": self.derivatives,
+        }
+
+
+class IngestionService:
+    """Runs OCR, cleanup and indexing for captured pages on a bounded worker pool.
+
+    The camera endpoint only captures and enqueues, so the next page can be
+    captured while earlier pages are still being processed. Thumbnails and
+    previews of a capture are made here too, alongside its OCR.
+    """
+
+    def __init__(
+        self,
+        ocr_service: OCRService,
+        ai_service: AIService,
+        qdrant_db: QdrantDatabase,
+        storage_service: StorageService,
+        workers: int = settings.INGESTION_WORKERS,
+        queue_size: int = settings.INGESTION_QUEUE_SIZE,
+    ):
+        self.ocr_service = ocr_service
+        self.ai_service = ai_service
+        self.qdrant_db = qdrant_db
+        self.storage_service = storage_service
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._index_queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # Jobs queued or in progress per scan session, for join(session_id)
+        self._pending: Counter = Counter()
+        self._idle: Optional[asyncio.Condition] = None
+        # Background re-index of each scan session being re-indexed
+        self._reindex_tasks: Dict[str, asyncio.Task] = {}
+
+    async def start(self):
+        # Created here so the queues bind to the running event loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._index_queue = asyncio.Queue()
+        self._idle = asyncio.Condition()
+        self._workers = [
+            asyncio.create_task(self._worker(worker_id))
+            for worker_id in range(self.worker_count)
+        ]
+        self._workers.append(asyncio.create_task(self._indexer()))
+        CustomLogger.create_log(
+            "info", f"Started ingestion pipeline with {self.worker_count} workers"
+        )
+
+    async def enqueue(self, job: IngestionJob):
+        # Waits when the queue is full so capture cannot outrun the workers forever
+        await self._queue.put(job)
+        # Counted only once queued, so a put cancelled while waiting (e.g. the
+        # camera disconnected) cannot leave join(session_id) waiting forever.
+        # No worker runs before this line, so the job is never done uncounted.
+        self._pending[job.session_id] += 1
+        await self._emit(
+            job, {"action": "scanning", "page_number": job.page_number}, camera=False
+        )
+
+    async def join(self, session_id: Optional[str] = None):
+        """Wait for queued pages to finish, only those of session_id if given."""
+        if session_id is None:
+            await self._queue.join()
+            return
+        async with self._idle:
+            await self._idle.wait_for(lambda: not self._pending[session_id])
+
+    async def close(self):
+        tasks = self._workers + list(self._reindex_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception as e:
+                CustomLogger.create_log(
+                    "error",
+                    f"Ingestion worker {worker_id} failed on page {job.page_number}: {str(e)}",
+                )
+                await self._emit(
+                    job,
+                    {
+                        "status": "error",
+                        "message": f"Failed to process image: {str(e)}",
+                        "blob_name": job.blob_name,
+                        "page_number": job.page_number,
+                    },
+                )
+            finally:
+                self._queue.task_done()
+                await self._job_done(job)
+
+    async def _job_done(self, job: IngestionJob):
+        async with self._idle:
+            self._pending[job.session_id] -= 1
+            if not self._pending[job.session_id]:
+                del self._pending[job.session_id]
+            self._idle.notify_all()
+
+    async def _process(self, job: IngestionJob):
+        if job.image_bytes is not None and not job.derivatives:
+            # Stored by the time the page is indexed, which records their names
+            (ocr_text, cleaned_text), job.derivatives = await asyncio.gather(
+                self._read_page(job),
+                store_derivatives(self.storage_service, job.image_bytes, job.blob_name),
+            )
+        else:
+            ocr_text, cleaned_text = await self._read_page(job)
+        await self._index_page(
+            (cleaned_text, job.page_number, job.blob_name, job.metadata)
+        )
+
+        await self._emit(
+            job,
+            {
+                "action": "click",
+                "page_number": job.page_number,
+                "ocr_text": ocr_text,
+            },
+        )
+
+    async def _read_page(self, job: IngestionJob):
+        """(ocr_text, cleaned_text) of a page."""
+        if job.image_bytes is not None:
+            ocr_result = await asyncio.to_thread(
+                self.ocr_service.ocr_content, job.image_bytes
+            )
+        else:
+            ocr_result = await asyncio.to_thread(
+                self.ocr_service.ocr_image, job.blob_name
+            )
+        ocr_text = ocr_result.text
+        CustomLogger.create_log("info", f"OCR Text: {ocr_text}")
+
+        await self._emit(
+            job, {"action": "processing", "page_number": job.page_number}, camera=False
+        )
+
+        cleaned_text = await self.ai_service.cleanup_ocr_result(ocr_result)
+        CustomLogger.create_log("info", f"Cleaned Text: {cleaned_text}")
+        return ocr_text, cleaned_text
+
+    async def _index_page(self, page: tuple):
+        done = asyncio.get_running_loop().create_future()
+        await self._index_queue.put((page, done))
+        await done
+
+    async def _indexer(self):
+        # Pages that finish cleanup together are embedded and upserted together
+        while True:
+            batch = [await self._index_queue.get()]
+            while not self._index_queue.empty():
+                batch.append(self._index_queue.get_nowait())
+
+            try:
+                await self.qdrant_db.add_pages([page for page, _ in batch])
+                for _, done in batch:
+                    if not done.done():
+                        done.set_result(None)
+            except Exception as e:
+                for _, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+
+    def start_reindex(
+        self, session_id: str, notebook_id: str, capture_prefix: str
+    ) -> bool:
+        """Replace the chunks of one scan session with a fresh OCR, cleanup
+        and bulk index of its captures under capture_prefix, in the
+        background. Returns False if the session is already being
+        re-indexed."""
+        if session_id in self._reindex_tasks:
+            return False
+        task = asyncio.create_task(
+            self._reindex_session(session_id, notebook_id, capture_prefix)
+        )
+        self._reindex_tasks[session_id] = task
+        task.add_done_callback(lambda _: self._reindex_tasks.pop(session_id, None))
+        return True
+
+    async def _reindex_session(
+        self, session_id: str, notebook_id: str, capture_prefix: str
+    ):
+        try:
+            await self.qdrant_db.delete_matching(
+                SearchFilter(notebook_id=notebook_id, session_id=session_id)
+            )
+            await self.reindex(
+                capture_prefix, notebook_id=notebook_id, session_id=session_id
+            )
+        except Exception as e:
+            CustomLogger.create_log(
+                "error", f"Re-indexing session {session_id} failed: {str(e)}"
+            )
+
+    async def reindex(
+        self,
+        base_path: str,
+        notebook_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        pages_per_batch: int = settings.OCR_BATCH_SIZE,
+    ) -> int:
+        """Re-OCR, clean and index every page under base_path with bulk upserts.
+
+        base_path is a storage prefix (or a URL of one) or a local directory,
+        as accepted by OCRService.iter_documents, and its pages are filed
+        under notebook_id and session_id. Pages from storage are stored by blob name; files
+        from a local directory keep their path as image_path since they
+        cannot be signed. Returns the number of pages indexed.
+        """
+        metadata = {"notebook_id": notebook_id, "session_id": session_id}
+        from_directory = os.path.isdir(base_path)
+        indexed = 0
+        pending = []
+        async for image_path, ocr_result in self.ocr_service.iter_documents(base_path):
+            pending.append((image_path, ocr_result))
+            if len(pending) >= pages_per_batch:
+                indexed += await self._reindex_batch(
+                    pending, indexed, metadata, from_directory
+                )
+                pending = []
+        if pending:
+            indexed += await self._reindex_batch(
+                pending, indexed, metadata, from_directory
+            )
+
+        CustomLogger.create_log("info", f"Re-indexed {indexed} pages from {base_path}")
+        return indexed
+
+    async def _reindex_batch(
+        self, pending, offset: int, metadata: dict, from_directory: bool
+    ) -> int:
+        cleaned_texts = await asyncio.gather(
+            *(
+                self.ai_service.cleanup_ocr_result(ocr_result)
+                for _, ocr_result in pending
+            )
+        )
+        pages = []
+        for position, ((image_path, _), cleaned_text) in enumerate(
+            zip(pending, cleaned_texts), start=offset + 1
+        ):
+            match = CAPTURE_NAME_PATTERN.search(image_path)
+            page_number = match.group(1) if match else str(position)
+            if from_directory:
+                page = (None, {**metadata, "image_path": image_path})
+            else:
+                page = (image_path, metadata)
+            pages.append((cleaned_text, page_number, *page))
+
+        await self.qdrant_db.add_pages(pages)
+        CustomLogger.create_log(
+            "info", f"OCR cleanup stats: {self.ai_service.cleanup_stats()}"
+        )
+        return len(pages)
+
+    async def _emit(self, job: IngestionJob, message: dict, camera: bool = True):
+        if camera and job.websocket is not None:
+            try:
+                await job.websocket.send_text(json.dumps(message))
+            except Exception:
+                # The camera may have disconnected while the page was processing
+                pass
+        await WebSocketService.broadcast_to_frontend(message, session_id=job.session_id)
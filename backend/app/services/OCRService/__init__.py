@@ -1,125 +1,190 @@
 # backend/app/services/OCRService/__init__.py
 
+import asyncio
 import os
-import tempfile
-from urllib.parse import urlparse
+import re
+from typing import AsyncIterator, List, Optional, Tuple
 
-from google.cloud import storage, vision
+from google.cloud import vision
 
 from app.config import settings
+from app.services.ClickPictureService.derivatives import is_derivative
+from app.services.OCRService.result import OCRResult
+from app.services.StorageService import StorageService
 from app.utils.logger import CustomLogger
 
 
+def _page_sort_key(path: str):
+    # Natural order, so capture_10 comes after capture_9
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+
 class OCRService:
-    def __init__(self):
-        self.client = vision.ImageAnnotatorClient.from_service_account_file(
+    """Vision OCR of page images.
+
+    An image is a local file path or, when a storage service is given, a
+    blob name or a URL of one of its blobs. Blob reads go through the storage
+    service and its disk cache, so re-OCR of pages this backend captured
+    reads them from local disk.
+    """
+
+    def __init__(
+        self,
+        client: Optional[vision.ImageAnnotatorClient] = None,
+        storage_service: Optional[StorageService] = None,
+    ):
+        self.client = client or vision.ImageAnnotatorClient.from_service_account_file(
             settings.GOOGLE_APPLICATION_CREDENTIALS
         )
-        self.storage_client = storage.Client()
-
-    def _download_from_gcs(self, image_url: str) -> str:
+        self.storage_service = storage_service
+
+    def _blob_name(self, image_path: str) -> Optional[str]:
+        if self.storage_service is None or os.path.exists(image_path):
+            return None
+        return self.storage_service.blob_name_from_url(image_path) or image_path
+
+    def _download_blob(self, blob_name: str) -> bytes:
+        result = self.storage_service.download_bytes(blob_name)
+        if not result["success"]:
+            CustomLogger.create_log(
+                "error", f"Error downloading {blob_name}: {result['error']}"
+            )
+            raise Exception(result["error"])
+        return result["data"]
+
+    def _read_image(self, image_path: str) -> bytes:
+        blob_name = self._blob_name(image_path)
+        if blob_name is not None:
+            return self._download_blob(blob_name)
+
+        with open(image_path, "rb") as image_file:
+            return image_file.read()
+
+    def ocr_image(self, image_path: str) -> OCRResult:
         try:
-            parsed_url = urlparse(image_url)
-
-            path_parts = parsed_url.path.strip("/").split("/")
-            bucket_name = path_parts[0]
-            blob_path = "/".join(path_parts[1:])
-
-            temp_dir = tempfile.gettempdir()
-            temp_path = os.path.join(temp_dir, os.path.basename(blob_path))
-
-            bucket = self.storage_client.bucket(bucket_name)
-            blob = bucket.blob(blob_path)
-
-            blob.cache_control = "no-cache, max-age=0"
-
-            blob.reload()
-
-            blob.download_to_filename(temp_path, if_generation_match=blob.generation)
-
-            return temp_path
+            CustomLogger.create_log("info", f"Reading image: {image_path}")
+            return self.ocr_content(self._read_image(image_path))
         except Exception as e:
-            CustomLogger.create_log("error", f"Error downloading from GCS: {str(e)}")
+            CustomLogger.create_log("error", f"Error in OCR processing: {str(e)}")
             raise
 
-    def ocr_image(self, image_path: str) -> str:
+    def ocr_content(self, content: bytes) -> OCRResult:
         try:
-            local_path = self._download_from_gcs(image_path)
-
-            CustomLogger.create_log("info", f"Local path: {local_path}")
-
-            with open(local_path, "rb") as image_file:
-                content = image_file.read()
-
             image = vision.Image(content=content)
             response = self.client.document_text_detection(image=image)
 
             if response.error.message:
                 raise Exception(f"Error detecting text: {response.error.message}")
 
-            extracted_text = ""
-            for page in response.full_text_annotation.pages:
-                for block in page.blocks:
-                    for paragraph in block.paragraphs:
-                        for word in paragraph.words:
-                            word_text = "".join(
-                                [symbol.text for symbol in word.symbols]
-                            )
-                            extracted_text += word_text + " "
-
-            if local_path != image_path:
-                os.remove(local_path)
-
-            return extracted_text.strip()
+            return OCRResult.from_annotation(response.full_text_annotation)
 
         except Exception as e:
             CustomLogger.create_log("error", f"Error in OCR processing: {str(e)}")
             raise
 
-    def process_documents(self, base_path: str) -> str:
+    def _list_images(self, base_path: str) -> List[str]:
+        """Page images under a local directory, or blob names under a storage
+        prefix given as a prefix or a URL. Thumbnails and previews of the
+        pages are left out."""
+        if os.path.isdir(base_path):
+            image_paths = [
+                os.path.join(base_path, f)
+                for f in os.listdir(base_path)
+                if f.lower().endswith((".jpg", ".jpeg"))
+            ]
+        else:
+            if self.storage_service is None:
+                raise FileNotFoundError(f"{base_path} is not a directory")
+            prefix = self.storage_service.blob_name_from_url(base_path) or base_path
+            result = self.storage_service.list_files(prefix=prefix)
+            if not result["success"]:
+                raise Exception(result["error"])
+            image_paths = [
+                name
+                for name in result["files"]
+                if name.lower().endswith((".jpg", ".jpeg"))
+            ]
+
+        image_paths = [path for path in image_paths if not is_derivative(path)]
+        return sorted(image_paths, key=_page_sort_key)
+
+    def _ocr_batch(self, image_paths: List[str]) -> List[OCRResult]:
+        feature = vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)
+        requests = [
+            vision.AnnotateImageRequest(
+                image=vision.Image(content=self._read_image(image_path)),
+                features=[feature],
+            )
+            for image_path in image_paths
+        ]
+        response = self.client.batch_annotate_images(requests=requests)
+
+        results = []
+        for image_path, page_response in zip(image_paths, response.responses):
+            if page_response.error.message:
+                raise Exception(
+                    f"Error detecting text in {image_path}: {page_response.error.message}"
+                )
+            results.append(
+                OCRResult.from_annotation(page_response.full_text_annotation)
+            )
+        return results
+
+    async def iter_documents(
+        self,
+        base_path: str,
+        batch_size: int = settings.OCR_BATCH_SIZE,
+        max_concurrent_batches: int = settings.OCR_MAX_CONCURRENT_BATCHES,
+    ) -> AsyncIterator[Tuple[str, OCRResult]]:
+        """Yield (image_path, OCRResult) for every page under base_path, in page order.
+
+        Pages are sent to Vision in batch_annotate_images requests of
+        batch_size, with up to max_concurrent_batches requests in flight.
+        """
+        image_paths = await asyncio.to_thread(self._list_images, base_path)
+        batches = [
+            image_paths[i : i + batch_size]
+            for i in range(0, len(image_paths), batch_size)
+        ]
+        CustomLogger.create_log(
+            "info",
+            f"Processing {len(image_paths)} pages in {len(batches)} OCR batches",
+        )
+
+        semaphore = asyncio.Semaphore(max_concurrent_batches)
+
+        async def run_batch(batch: List[str]) -> List[OCRResult]:
+            async with semaphore:
+                return await asyncio.to_thread(self._ocr_batch, batch)
+
+        tasks = [asyncio.create_task(run_batch(batch)) for batch in batches]
+        try:
+            for batch, task in zip(batches, tasks):
+                for image_path, result in zip(batch, await task):
+                    yield image_path, result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def process_documents(
+        self,
+        base_path: str,
+        batch_size: int = settings.OCR_BATCH_SIZE,
+        max_concurrent_batches: int = settings.OCR_MAX_CONCURRENT_BATCHES,
+    ) -> str:
         try:
             all_text = []
-
-            if base_path.startswith("https://storage.googleapis.com/"):
-                parsed_url = urlparse(base_path)
-                path_parts = parsed_url.path.strip("/").split("/")
-                bucket_name = path_parts[0]
-                prefix = "/".join(path_parts[1:])
-
-                bucket = self.storage_client.bucket(bucket_name)
-                blobs = bucket.list_blobs(prefix=prefix)
-                image_files = [
-                    blob.name
-                    for blob in blobs
-                    if blob.name.lower().endswith((".jpg", ".jpeg"))
-                ]
-                image_files.sort()
-
-                for image_file in image_files:
-                    image_url = (
-                        f"https://storage.googleapis.com/{bucket_name}/{image_file}"
-                    )
-                    CustomLogger.create_log(
-                        "info", f"Processing file {image_file} from GCS"
-                    )
-                    page_text = self.ocr_image(image_url)
-                    all_text.append(page_text)
-            else:
-                image_files = [
-                    f for f in os.listdir(base_path) if f.endswith((".jpg", ".JPG"))
-                ]
-                image_files.sort()
-
-                for image_file in image_files:
-                    image_path = os.path.join(base_path, image_file)
-                    CustomLogger.create_log(
-                        "info", f"Processing file {image_file} at {image_path}"
-                    )
-                    page_text = self.ocr_image(image_path)
-                    all_text.append(page_text)
+            async for image_path, result in self.iter_documents(
+                base_path, batch_size, max_concurrent_batches
+            ):
+                CustomLogger.create_log("info", f"Processed file {image_path}")
+                all_text.append(result.text)
 
             return "\n\n".join(all_text)
 
         except Exception as e:
             CustomLogger.create_log("error", f"Error processing document: {str(e)}")
             raise
+
+    def close(self):
+        self.client.transport.close()
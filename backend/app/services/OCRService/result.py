@@ -0,0 +1,122 @@
+# backend/app/services/OCRService/result.py
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+
+@dataclass
+class OCRParagraph:
+    text: str
+    # (x_min, y_min, x_max, y_max) in image pixels
+    bounding_box: Tuple[int, int, int, int]
+    confidence: float
+
+
+class OCRResult:
+    """Paragraph-level OCR output built in one pass over a Vision annotation.
+
+    Layout and confidences live in numpy arrays indexed by paragraph, with
+    word confidences stored flat and sliced by paragraph_word_offsets.
+    """
+
+    def __init__(
+        self,
+        paragraph_texts: List[str],
+        bounding_boxes: np.ndarray,
+        word_confidences: np.ndarray,
+        paragraph_word_offsets: np.ndarray,
+    ):
+        self.paragraph_texts = paragraph_texts
+        self.bounding_boxes = bounding_boxes
+        self.word_confidences = word_confidences
+        self.paragraph_word_offsets = paragraph_word_offsets
+        self._text = None
+
+    @classmethod
+    def from_annotation(cls, annotation) -> "OCRResult":
+        paragraph_texts = []
+        boxes = []
+        word_confidences = []
+        offsets = [0]
+
+        for page in annotation.pages:
+            for block in page.blocks:
+                for paragraph in block.paragraphs:
+                    words = []
+                    for word in paragraph.words:
+                        words.append("".join([symbol.text for symbol in word.symbols]))
+                        word_confidences.append(word.confidence)
+                    if not words:
+                        continue
+
+                    paragraph_texts.append(" ".join(words))
+                    vertices = paragraph.bounding_box.vertices
+                    xs = [vertex.x for vertex in vertices] or [0]
+                    ys = [vertex.y for vertex in vertices] or [0]
+                    boxes.append((min(xs), min(ys), max(xs), max(ys)))
+                    offsets.append(len(word_confidences))
+
+        return cls(
+            paragraph_texts=paragraph_texts,
+            bounding_boxes=np.array(boxes, dtype=np.int32).reshape(-1, 4),
+            word_confidences=np.array(word_confidences, dtype=np.float32),
+            paragraph_word_offsets=np.array(offsets, dtype=np.int32),
+        )
+
+    @property
+    def text(self) -> str:
+        # Same plain-text view as the old word-by-word concatenation
+        if self._text is None:
+            self._text = " ".join(self.paragraph_texts)
+        return self._text
+
+    @property
+    def layout_text(self) -> str:
+        # Paragraphs separated by blank lines, for cleanup and chunking
+        return "\n\n".join(self.paragraph_texts)
+
+    @property
+    def paragraph_confidences(self) -> np.ndarray:
+        if not self.paragraph_texts:
+            return np.zeros(0, dtype=np.float32)
+        sums = np.add.reduceat(self.word_confidences, self.paragraph_word_offsets[:-1])
+        counts = np.diff(self.paragraph_word_offsets)
+        return sums / counts
+
+    @property
+    def paragraph_min_word_confidences(self) -> np.ndarray:
+        if not self.paragraph_texts:
+            return np.zeros(0, dtype=np.float32)
+        return np.minimum.reduceat(
+            self.word_confidences, self.paragraph_word_offsets[:-1]
+        )
+
+    def low_confidence_paragraphs(
+        self, paragraph_threshold: float, word_threshold: float
+    ) -> np.ndarray:
+        """Indexes of paragraphs whose mean word confidence is below
+        paragraph_threshold, or that contain any word below word_threshold."""
+        uncertain = (self.paragraph_confidences < paragraph_threshold) | (
+            self.paragraph_min_word_confidences < word_threshold
+        )
+        return np.flatnonzero(uncertain)
+
+    @property
+    def paragraphs(self) -> List[OCRParagraph]:
+        confidences = self.paragraph_confidences
+        return [
+            OCRParagraph(
+                text=text,
+                bounding_box=tuple(int(v) for v in self.bounding_boxes[i]),
+                confidence=float(confidences[i]),
+            )
+            for i, text in enumerate(self.paragraph_texts)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.paragraph_texts)
+
+    def __str__(self) -> str:
+        return self.text
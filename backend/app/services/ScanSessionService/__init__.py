@@ -0,0 +1,97 @@
+# backend/app/services/ScanSessionService/__init__.py
+
+import asyncio
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.services.ClickPictureService import ClickPictureService
+from app.services.StorageService import StorageService
+from app.utils.logger import CustomLogger
+
+CAPTURE_ROOT = "captures/"
+# IDs end up in blob names and Qdrant payloads, so keep them path safe
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def capture_root(session_id: str) -> str:
+    return f"{CAPTURE_ROOT}{session_id}/"
+
+
+@dataclass
+class ScanSession:
+    session_id: str
+    # Pages of every session with the same notebook ID are searched together
+    notebook_id: str
+    click_picture_service: ClickPictureService
+    camera_id: Optional[str] = None
+
+    @property
+    def capture_prefix(self) -> str:
+        return self.click_picture_service.prefix
+
+    def describe(self) -> dict:
+        return {"session_id": self.session_id, "notebook_id": self.notebook_id}
+
+
+class ScanSessionService:
+    """Tracks the scanning stations connected to this backend.
+
+    Each session gets its own capture prefix, page counter and camera, so
+    several stations can scan at once without touching each other's pages.
+    A session ID can only have one camera connected at a time.
+    """
+
+    def __init__(self, storage_service: StorageService):
+        self.storage_service = storage_service
+        self._sessions: Dict[str, ScanSession] = {}
+
+    def open(
+        self,
+        session_id: Optional[str] = None,
+        notebook_id: Optional[str] = None,
+        camera_index: Optional[int] = None,
+    ) -> Optional[ScanSession]:
+        """Register a session, or return None if session_id is already active."""
+        session_id = session_id or uuid.uuid4().hex[:12]
+        notebook_id = notebook_id or session_id
+        for value in (session_id, notebook_id):
+            if not SESSION_ID_PATTERN.match(value):
+                raise ValueError(f"Invalid session or notebook ID: {value}")
+
+        if session_id in self._sessions:
+            return None
+
+        session = ScanSession(
+            session_id=session_id,
+            notebook_id=notebook_id,
+            click_picture_service=ClickPictureService(
+                self.storage_service,
+                prefix=capture_root(session_id),
+                camera_index=camera_index,
+            ),
+        )
+        self._sessions[session_id] = session
+        CustomLogger.create_log(
+            "info", f"Opened scan session {session_id} for notebook {notebook_id}"
+        )
+        return session
+
+    def get(self, session_id: str) -> Optional[ScanSession]:
+        return self._sessions.get(session_id)
+
+    def sessions(self) -> List[ScanSession]:
+        return list(self._sessions.values())
+
+    async def close(self, session_id: str):
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        # Releases the camera and uploads the final manifest
+        await asyncio.to_thread(session.click_picture_service.close)
+        CustomLogger.create_log("info", f"Closed scan session {session_id}")
+
+    async def close_all(self):
+        for session_id in list(self._sessions):
+            await self.close(session_id)
@@ -0,0 +1,64 @@
+# backend/app/services/ServiceContainer/__init__.py
+
+import inspect
+
+from fastapi.requests import HTTPConnection
+
+from app.database.qdrant import QdrantDatabase
+from app.services.AIService import AIService
+from app.services.CleanupService import CleanupService
+from app.services.IngestionService import IngestionService
+from app.services.OCRService import OCRService
+from app.services.ScanSessionService import ScanSessionService
+from app.services.StorageService import create_storage_service
+from app.utils.logger import CustomLogger
+
+
+class ServiceContainer:
+    """Holds the long-lived clients shared by every HTTP and WebSocket route.
+
+    Built once in the app lifespan so requests never pay for opening Qdrant,
+    GCS, Vision or Gemini clients.
+    """
+
+    def __init__(self):
+        CustomLogger.create_log("info", "Initializing service container")
+        self.qdrant_db = QdrantDatabase()
+        self.ai_service = AIService(self.qdrant_db)
+        self.storage_service = create_storage_service()
+        self.scan_sessions = ScanSessionService(self.storage_service)
+        self.ocr_service = OCRService(storage_service=self.storage_service)
+        self.ingestion_service = IngestionService(
+            self.ocr_service, self.ai_service, self.qdrant_db, self.storage_service
+        )
+        self.cleanup_service = CleanupService(self.storage_service, self.qdrant_db)
+
+    async def start(self):
+        await self.qdrant_db.initialize()
+        # Before ingestion, so pages are never indexed into a notebook whose
+        # journaled reset has not been re-applied yet
+        await self.cleanup_service.start()
+        await self.ingestion_service.start()
+
+    async def close(self):
+        CustomLogger.create_log("info", "Closing service container")
+        for close in (
+            self.ingestion_service.close,
+            self.cleanup_service.close,
+            self.scan_sessions.close_all,
+            self.ocr_service.close,
+            self.storage_service.close,
+            self.qdrant_db.close,
+        ):
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                CustomLogger.create_log(
+                    "error", f"Error closing {close.__qualname__}: {str(e)}"
+                )
+
+
+def get_services(connection: HTTPConnection) -> ServiceContainer:
+    return connection.app.state.services
@@ -0,0 +1,277 @@
+# backend/app/services/StorageService/__init__.py
+
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.services.StorageService.backends import (
+    BlobInfo,
+    BlobNotFound,
+    GCSBackend,
+    LocalBackend,
+    StorageBackend,
+)
+from app.services.StorageService.cache import BlobInfoCache, SignedUrlCache
+from app.services.StorageService.disk_cache import DiskCache, get_disk_cache
+from app.utils.logger import CustomLogger
+
+
+class StorageService:
+    """Captures, derivatives and manifests on a pluggable StorageBackend.
+
+    Adds the signed URL cache and, for remote backends, the local disk cache
+    on top of the backend. Every method blocks; the a-prefixed twins run on
+    the backend's bounded thread pool for use in async code.
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        disk_cache: Optional[DiskCache] = None,
+        revalidate_seconds: float = settings.STORAGE_REVALIDATE_SECONDS,
+    ):
+        self.backend = backend
+        # Blobs this backend wrote or read before are served from local disk
+        self.disk_cache = disk_cache or (get_disk_cache() if backend.remote else None)
+        self.signed_urls = SignedUrlCache(
+            maxsize=settings.SIGNED_URL_CACHE_SIZE,
+            expiration=settings.SIGNED_URL_EXPIRATION_SECONDS,
+            refresh_margin=settings.SIGNED_URL_REFRESH_MARGIN_SECONDS,
+        )
+        # Generations of blobs written or stat-ed in the last few seconds
+        self.blob_infos = (
+            BlobInfoCache(
+                maxsize=settings.SIGNED_URL_CACHE_SIZE, ttl=revalidate_seconds
+            )
+            if revalidate_seconds > 0
+            else None
+        )
+
+    def blob_name_from_url(self, url: str) -> Optional[str]:
+        return self.backend.blob_name_from_url(url)
+
+    def sign_url(self, blob_name: str) -> str:
+        """Signed GET URL for blob_name, reused until close to expiry.
+
+        Raises if the URL cannot be signed.
+        """
+        url = self.signed_urls.get(blob_name)
+        if url is None:
+            url = self.backend.sign(blob_name, self.signed_urls.expiration)
+            self.signed_urls.set(blob_name, url)
+        return url
+
+    def get_public_url(self, blob_name: str) -> Optional[str]:
+        try:
+            return self.sign_url(blob_name)
+        except Exception as e:
+            CustomLogger.create_log("error", f"Error generating signed URL: {str(e)}")
+            return None
+
+    def sign_urls(self, blob_names: Iterable[str]) -> Dict[str, str]:
+        """Signed URLs for many blobs at once, keyed by blob name.
+
+        Only blobs without a fresh cached URL are signed, each once. Blobs
+        that cannot be signed are left out.
+        """
+        signed = {}
+        for blob_name in dict.fromkeys(blob_names):
+            url = self.get_public_url(blob_name)
+            if url is not None:
+                signed[blob_name] = url
+        return signed
+
+    def upload_file(
+        self, file_path: str, destination_blob_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if not os.path.exists(file_path):
+            return {"success": False, "error": f"File {file_path} does not exist"}
+
+        if destination_blob_name is None:
+            destination_blob_name = os.path.basename(file_path)
+
+        with open(file_path, "rb") as file:
+            data = file.read()
+        return self.upload_bytes(data, destination_blob_name)
+
+    def upload_bytes(
+        self,
+        data: bytes,
+        destination_blob_name: str,
+        content_type: str = "application/octet-stream",
+        sign_url: bool = True,
+    ) -> Dict[str, Any]:
+        try:
+            info = self.backend.put(destination_blob_name, data, content_type)
+            self._remember(destination_blob_name, info)
+            if self.disk_cache is not None:
+                # Write through, so OCR and image requests for it never download
+                self.disk_cache.put(
+                    self.backend.name, destination_blob_name, info.generation, data
+                )
+
+            result = {"success": True, "blob_name": destination_blob_name}
+            if sign_url:
+                result["file_path"] = self.get_public_url(destination_blob_name)
+            return result
+        except Exception as e:
+            CustomLogger.create_log("error", f"Error uploading to storage: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def delete_file(self, blob_name: str) -> Dict[str, Any]:
+        try:
+            self.backend.delete(blob_name)
+            self.signed_urls.discard(blob_name)
+            self._forget(blob_name)
+            if self.disk_cache is not None:
+                self.disk_cache.discard(self.backend.name, blob_name)
+            return {"success": True}
+        except Exception as e:
+            CustomLogger.create_log("error", f"Error deleting from storage: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def delete_files(self, blob_names: List[str]) -> Dict[str, Any]:
+        """Delete many blobs, batched where the backend supports it."""
+        try:
+            self.backend.delete_many(blob_names)
+            for blob_name in blob_names:
+                self.signed_urls.discard(blob_name)
+                self._forget(blob_name)
+                if self.disk_cache is not None:
+                    self.disk_cache.discard(self.backend.name, blob_name)
+            return {"success": True, "deleted": len(blob_names)}
+        except Exception as e:
+            CustomLogger.create_log("error", f"Error deleting from storage: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def list_files(self, prefix: str = "") -> Dict[str, Any]:
+        try:
+            files = [blob.name for blob in self.backend.list(prefix)]
+            return {"success": True, "files": files}
+        except Exception as e:
+            CustomLogger.create_log("error", f"Error listing storage: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def list_file_details(self, prefix: str = "") -> Dict[str, Any]:
+        try:
+            files = [
+                {"name": blob.name, "size": blob.size, "updated": blob.updated}
+                for blob in self.backend.list(prefix)
+            ]
+            return {"success": True, "files": files}
+        except Exception as e:
+            CustomLogger.create_log("error", f"Error listing storage: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def blob_info(self, blob_name: str) -> BlobInfo:
+        """Metadata of blob_name, from a write or stat of the last
+        revalidate_seconds when there was one. Raises BlobNotFound."""
+        return self._known_info(blob_name) or self._stat(blob_name)
+
+    def download_bytes(self, blob_name: str) -> Dict[str, Any]:
+        """Blob contents, from the disk cache when the cached copy has the
+        blob's current generation.
+
+        A generation seen in the last revalidate_seconds is trusted, so a hit
+        on a recently written or read blob makes no backend request at all.
+        Otherwise only the metadata request goes to the backend on a hit.
+        """
+        try:
+            known = self._known_info(blob_name)
+            info = known or self._stat(blob_name)
+            data = None
+            if self.disk_cache is not None:
+                data = self.disk_cache.get(
+                    self.backend.name, blob_name, info.generation
+                )
+            if data is None:
+                if known is not None:
+                    # About to download anyway, so confirm a trusted
+                    # generation first; a fresh stat needs no second look
+                    info = self._stat(blob_name)
+                # Pinned to the generation validated above
+                data = self.backend.get(blob_name, info.generation)
+                if self.disk_cache is not None:
+                    self.disk_cache.put(
+                        self.backend.name, blob_name, info.generation, data
+                    )
+            return {
+                "success": True,
+                "data": data,
+                "content_type": info.content_type,
+                "generation": info.generation,
+            }
+        except BlobNotFound:
+            return {"success": False, "error": f"{blob_name} does not exist"}
+        except Exception as e:
+            CustomLogger.create_log(
+                "error", f"Error downloading from storage: {str(e)}"
+            )
+            return {"success": False, "error": str(e)}
+
+    def _known_info(self, blob_name: str) -> Optional[BlobInfo]:
+        return self.blob_infos.get(blob_name) if self.blob_infos else None
+
+    def _stat(self, blob_name: str) -> BlobInfo:
+        info = self.backend.stat(blob_name)
+        if info is None:
+            self._forget(blob_name)
+            raise BlobNotFound(blob_name)
+        self._remember(blob_name, info)
+        return info
+
+    def _remember(self, blob_name: str, info: BlobInfo):
+        if self.blob_infos is not None:
+            self.blob_infos.set(blob_name, info)
+
+    def _forget(self, blob_name: str):
+        if self.blob_infos is not None:
+            self.blob_infos.discard(blob_name)
+
+    def download_file(
+        self, blob_name: str, destination_file_path: str
+    ) -> Dict[str, Any]:
+        result = self.download_bytes(blob_name)
+        if result["success"]:
+            with open(destination_file_path, "wb") as file:
+                file.write(result.pop("data"))
+        return result
+
+    async def aupload_bytes(self, *args, **kwargs) -> Dict[str, Any]:
+        return await self.backend.run(self.upload_bytes, *args, **kwargs)
+
+    async def adownload_bytes(self, blob_name: str) -> Dict[str, Any]:
+        return await self.backend.run(self.download_bytes, blob_name)
+
+    async def ablob_info(self, blob_name: str) -> BlobInfo:
+        return await self.backend.run(self.blob_info, blob_name)
+
+    async def adelete_file(self, blob_name: str) -> Dict[str, Any]:
+        return await self.backend.run(self.delete_file, blob_name)
+
+    async def adelete_files(self, blob_names: List[str]) -> Dict[str, Any]:
+        return await self.backend.run(self.delete_files, list(blob_names))
+
+    async def alist_files(self, prefix: str = "") -> Dict[str, Any]:
+        return await self.backend.run(self.list_files, prefix)
+
+    async def asign_urls(self, blob_names: Iterable[str]) -> Dict[str, str]:
+        return await self.backend.run(self.sign_urls, list(blob_names))
+
+    def close(self):
+        self.backend.close()
+
+
+def create_storage_service() -> StorageService:
+    if settings.STORAGE_BACKEND == "local":
+        backend = LocalBackend(
+            settings.STORAGE_LOCAL_ROOT,
+            base_url=settings.STORAGE_LOCAL_URL,
+            signing_key=settings.STORAGE_LOCAL_SIGNING_KEY,
+        )
+    elif settings.STORAGE_BACKEND == "gcs":
+        backend = GCSBackend(settings.GCP_BUCKET_NAME)
+    else:
+        raise ValueError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
+    CustomLogger.create_log("info", f"Using storage backend {backend.name}")
+    return StorageService(backend)
@@ -0,0 +1,329 @@
+# backend/app/services/StorageService/backends.py
+
+import asyncio
+import functools
+import hashlib
+import hmac
+import mimetypes
+import os
+import secrets
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import quote, unquote, urlencode, urlparse
+
+from google.api_core.exceptions import NotFound
+from google.cloud import storage
+
+from app.config import settings
+from app.services.StorageService.client import close_storage_client, get_storage_client
+
+
+class BlobNotFound(Exception):
+    pass
+
+
+@dataclass
+class BlobInfo:
+    name: str
+    size: int
+    # Changes on every write of the blob, used to validate cached copies
+    generation: int
+    updated: float
+    content_type: Optional[str] = None
+
+
+class StorageBackend(ABC):
+    """Blob store behind StorageService.
+
+    Implementations provide blocking put/get/stat/list/delete/sign methods.
+    The a-prefixed twins run them on a bounded thread pool shared by the
+    backend, so async code never blocks the event loop on blob I/O and a
+    burst of requests cannot start unbounded threads.
+    """
+
+    # Identifies the store in disk cache keys, e.g. gs://bucket
+    name: str
+    # Whether reads are worth caching on local disk
+    remote: bool = True
+
+    def __init__(self, workers: int = settings.STORAGE_IO_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="storage"
+        )
+
+    @abstractmethod
+    def put(self, name: str, data: bytes, content_type: str) -> BlobInfo: ...
+
+    @abstractmethod
+    def get(self, name: str, generation: Optional[int] = None) -> bytes:
+        """Blob contents, raising BlobNotFound if it does not exist or, when
+        generation is given, no longer has that generation."""
+
+    @abstractmethod
+    def stat(self, name: str) -> Optional[BlobInfo]: ...
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> List[BlobInfo]: ...
+
+    @abstractmethod
+    def delete(self, name: str): ...
+
+    @abstractmethod
+    def delete_many(self, names: List[str]):
+        """Delete blobs in as few round trips as the store allows. Blobs that
+        no longer exist are skipped."""
+
+    @abstractmethod
+    def sign(self, name: str, expiration: int) -> str:
+        """URL a browser can GET the blob from for expiration seconds."""
+
+    @abstractmethod
+    def blob_name_from_url(self, url: str) -> Optional[str]:
+        """Blob name of a URL pointing into this store, signed or not, or
+        None for anything else."""
+
+    async def run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(function, *args, **kwargs)
+        )
+
+    async def aput(self, name: str, data: bytes, content_type: str) -> BlobInfo:
+        return await self.run(self.put, name, data, content_type)
+
+    async def aget(self, name: str, generation: Optional[int] = None) -> bytes:
+        return await self.run(self.get, name, generation)
+
+    async def astat(self, name: str) -> Optional[BlobInfo]:
+        return await self.run(self.stat, name)
+
+    async def alist(self, prefix: str = "") -> List[BlobInfo]:
+        return await self.run(self.list, prefix)
+
+    async def adelete(self, name: str):
+        return await self.run(self.delete, name)
+
+    async def adelete_many(self, names: List[str]):
+        return await self.run(self.delete_many, names)
+
+    async def asign(self, name: str, expiration: int) -> str:
+        return await self.run(self.sign, name, expiration)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class GCSBackend(StorageBackend):
+    HOST = "storage.googleapis.com"
+
+    def __init__(
+        self,
+        bucket_name: str,
+        storage_client: Optional[storage.Client] = None,
+        workers: int = settings.STORAGE_IO_WORKERS,
+    ):
+        super().__init__(workers)
+        self.bucket_name = bucket_name
+        self.name = f"gs://{bucket_name}"
+        self.storage_client = storage_client or get_storage_client()
+        self.bucket = self.storage_client.bucket(bucket_name)
+
+    @staticmethod
+    def _info(blob) -> BlobInfo:
+        return BlobInfo(
+            name=blob.name,
+            size=blob.size,
+            generation=blob.generation,
+            updated=blob.updated.timestamp() if blob.updated else 0.0,
+            content_type=blob.content_type,
+        )
+
+    def put(self, name: str, data: bytes, content_type: str) -> BlobInfo:
+        blob = self.bucket.blob(name)
+        blob.cache_control = "private"
+        blob.upload_from_string(data, content_type=content_type)
+        return BlobInfo(
+            name=name,
+            size=len(data),
+            generation=blob.generation,
+            updated=blob.updated.timestamp() if blob.updated else time.time(),
+            content_type=content_type,
+        )
+
+    def get(self, name: str, generation: Optional[int] = None) -> bytes:
+        try:
+            return self.bucket.blob(name).download_as_bytes(
+                if_generation_match=generation
+            )
+        except NotFound:
+            raise BlobNotFound(name)
+
+    def stat(self, name: str) -> Optional[BlobInfo]:
+        blob = self.bucket.get_blob(name)
+        return self._info(blob) if blob is not None else None
+
+    def list(self, prefix: str = "") -> List[BlobInfo]:
+        return [self._info(blob) for blob in self.bucket.list_blobs(prefix=prefix)]
+
+    def delete(self, name: str):
+        try:
+            self.bucket.blob(name).delete()
+        except NotFound:
+            raise BlobNotFound(name)
+
+    def delete_many(self, names: List[str]):
+        # One batch request carries up to 100 deletes; missing blobs only
+        # fail their own sub-request
+        with self.storage_client.batch(raise_exception=False):
+            for name in names:
+                self.bucket.blob(name).delete()
+
+    def sign(self, name: str, expiration: int) -> str:
+        return self.bucket.blob(name).generate_signed_url(
+            version="v4", expiration=expiration, method="GET"
+        )
+
+    def blob_name_from_url(self, url: str) -> Optional[str]:
+        parsed = urlparse(url)
+        if parsed.scheme != "https" or parsed.netloc != self.HOST:
+            return None
+        bucket_name, _, name = parsed.path.lstrip("/").partition("/")
+        if bucket_name != self.bucket_name or not name:
+            return None
+        return unquote(name)
+
+    def close(self):
+        super().close()
+        close_storage_client()
+
+
+class LocalBackend(StorageBackend):
+    """Blobs as files under root, for running without any cloud.
+
+    The generation is the file's modification time in nanoseconds. Signed
+    URLs point at the /api/files endpoint and carry an HMAC of the blob name
+    and expiry, checked by verify().
+    """
+
+    remote = False
+
+    def __init__(
+        self,
+        root: str,
+        base_url: str,
+        signing_key: str = "",
+        workers: int = settings.STORAGE_IO_WORKERS,
+    ):
+        super().__init__(workers)
+        self.root = os.path.abspath(root)
+        self.name = f"file://{self.root}"
+        self.base_url = base_url.rstrip("/")
+        # A random key invalidates URLs signed before a restart, like expiry
+        self._signing_key = (
+            signing_key.encode("utf-8") if signing_key else secrets.token_bytes(32)
+        )
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, name))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid blob name: {name}")
+        return path
+
+    def _info(self, name: str, path: str) -> BlobInfo:
+        stat = os.stat(path)
+        return BlobInfo(
+            name=name,
+            size=stat.st_size,
+            generation=stat.st_mtime_ns,
+            updated=stat.st_mtime,
+            content_type=mimetypes.guess_type(name)[0],
+        )
+
+    def put(self, name: str, data: bytes, content_type: str) -> BlobInfo:
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        info = self._info(name, path)
+        info.content_type = content_type
+        return info
+
+    def get(self, name: str, generation: Optional[int] = None) -> bytes:
+        path = self._path(name)
+        try:
+            with open(path, "rb") as file:
+                if (
+                    generation is not None
+                    and os.fstat(file.fileno()).st_mtime_ns != generation
+                ):
+                    raise BlobNotFound(name)
+                return file.read()
+        except FileNotFoundError:
+            raise BlobNotFound(name)
+
+    def stat(self, name: str) -> Optional[BlobInfo]:
+        try:
+            return self._info(name, self._path(name))
+        except FileNotFoundError:
+            return None
+
+    def list(self, prefix: str = "") -> List[BlobInfo]:
+        # Prefixes need not end at a directory, e.g. captures/capture_1
+        directory = os.path.dirname(self._path(prefix + "_"))
+        blobs = []
+        for current, _, files in os.walk(directory):
+            for file_name in files:
+                if file_name.endswith(".tmp"):
+                    continue
+                path = os.path.join(current, file_name)
+                name = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if name.startswith(prefix):
+                    blobs.append(self._info(name, path))
+        return sorted(blobs, key=lambda blob: blob.name)
+
+    def delete(self, name: str):
+        try:
+            os.unlink(self._path(name))
+        except FileNotFoundError:
+            raise BlobNotFound(name)
+
+    def delete_many(self, names: List[str]):
+        for name in names:
+            try:
+                os.unlink(self._path(name))
+            except FileNotFoundError:
+                pass
+
+    def _signature(self, name: str, expires: int) -> str:
+        message = f"{name}\n{expires}".encode("utf-8")
+        return hmac.new(self._signing_key, message, hashlib.sha256).hexdigest()
+
+    def sign(self, name: str, expiration: int) -> str:
+        expires = int(time.time()) + expiration
+        query = urlencode(
+            {"expires": expires, "signature": self._signature(name, expires)}
+        )
+        return f"{self.base_url}/{quote(name)}?{query}"
+
+    def verify(self, name: str, expires: int, signature: str) -> bool:
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(name, expires), signature)
+
+    def blob_name_from_url(self, url: str) -> Optional[str]:
+        path = urlparse(url).path
+        base_path = urlparse(self.base_url).path
+        if not url.startswith(self.base_url) or not path.startswith(base_path + "/"):
+            return None
+        return unquote(path[len(base_path) + 1 :]) or None
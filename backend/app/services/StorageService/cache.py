@@ -0,0 +1,83 @@
+# backend/app/services/StorageService/cache.py
+
+import threading
+from typing import Dict, Optional
+
+from cachetools import TTLCache
+
+from app.services.StorageService.backends import BlobInfo
+
+
+class SignedUrlCache:
+    """Bounded cache of signed URLs by blob name.
+
+    Entries expire refresh_margin seconds before the URL itself does, so a
+    URL handed out from the cache is always valid for at least that long.
+    """
+
+    def __init__(self, maxsize: int, expiration: int, refresh_margin: int):
+        if refresh_margin >= expiration:
+            raise ValueError("refresh_margin must be shorter than expiration")
+        self.expiration = expiration
+        self._cache: TTLCache = TTLCache(
+            maxsize=maxsize, ttl=expiration - refresh_margin
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, blob_name: str) -> Optional[str]:
+        with self._lock:
+            url = self._cache.get(blob_name)
+            if url is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return url
+
+    def set(self, blob_name: str, url: str):
+        with self._lock:
+            self._cache[blob_name] = url
+
+    def discard(self, blob_name: str):
+        with self._lock:
+            self._cache.pop(blob_name, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class BlobInfoCache:
+    """BlobInfo of recently written or stat-ed blobs by blob name.
+
+    Lets a disk cache hit skip the metadata request: a cached copy whose
+    generation was seen less than ttl seconds ago is served as is. Only a
+    write by another process within ttl can make that copy stale.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, blob_name: str) -> Optional[BlobInfo]:
+        with self._lock:
+            return self._cache.get(blob_name)
+
+    def set(self, blob_name: str, info: BlobInfo):
+        with self._lock:
+            self._cache[blob_name] = info
+
+    def discard(self, blob_name: str):
+        with self._lock:
+            self._cache.pop(blob_name, None)
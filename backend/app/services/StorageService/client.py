@@ -0,0 +1,29 @@
+# backend/app/services/StorageService/client.py
+
+from functools import lru_cache
+
+from google.cloud import storage
+from requests.adapters import HTTPAdapter
+
+from app.config import settings
+
+
+@lru_cache(maxsize=None)
+def get_storage_client() -> storage.Client:
+    """Process-wide storage client, so every bucket and the OCR service share
+    one set of credentials and one pool of keep-alive connections."""
+    client = storage.Client()
+    # requests keeps 10 connections per host by default, which the ingestion
+    # workers and image requests exhaust, paying a new TLS handshake each time
+    adapter = HTTPAdapter(
+        pool_connections=settings.STORAGE_HTTP_POOL_SIZE,
+        pool_maxsize=settings.STORAGE_HTTP_POOL_SIZE,
+    )
+    client._http.mount("https://", adapter)
+    return client
+
+
+def close_storage_client():
+    if get_storage_client.cache_info().currsize:
+        get_storage_client().close()
+        get_storage_client.cache_clear()
@@ -0,0 +1,228 @@
+# backend/app/services/StorageService/disk_cache.py
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, Optional
+
+from app.config import settings
+from app.utils.logger import CustomLogger
+
+
+@dataclass
+class CacheEntry:
+    bucket: str
+    blob_name: str
+    generation: int
+    digest: str
+    size: int
+
+
+class DiskCache:
+    """Size-bounded, content-addressed LRU cache of blob contents on local disk.
+
+    Contents live once per SHA-256 digest under objects/, so identical blobs
+    share a file. Each (bucket, blob) key has a small ref file under refs/
+    holding the generation it was cached at and its digest; a lookup for any
+    other generation is a miss, so overwritten blobs are never served stale.
+    Refs are reloaded on startup, oldest first, so the cache survives restarts.
+    Reads go through mmap, so hot files come straight from the page cache.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._objects_dir = os.path.join(root, "objects")
+        self._refs_dir = os.path.join(root, "refs")
+        os.makedirs(self._objects_dir, exist_ok=True)
+        os.makedirs(self._refs_dir, exist_ok=True)
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._refcounts: Counter = Counter()
+        self._object_sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self._load()
+
+    @staticmethod
+    def _key(bucket: str, blob_name: str) -> str:
+        return f"{bucket}/{blob_name}"
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self._objects_dir, digest[:2], digest)
+
+    def _ref_path(self, key: str) -> str:
+        return os.path.join(
+            self._refs_dir, hashlib.sha256(key.encode("utf-8")).hexdigest()
+        )
+
+    def get(self, bucket: str, blob_name: str, generation: int) -> Optional[bytes]:
+        """Contents of the blob at generation, or None if not cached."""
+        key = self._key(bucket, blob_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.generation != generation:
+                self.stale += 1
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            path = self._object_path(entry.digest)
+
+        try:
+            data = self._read(path)
+        except OSError:
+            # Evicted between the lookup and the read, or removed from disk
+            with self._lock:
+                self.misses += 1
+                if self._entries.get(key) is entry:
+                    self._drop(key)
+            return None
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(data)
+        return data
+
+    def put(self, bucket: str, blob_name: str, generation: int, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        digest = hashlib.sha256(data).hexdigest()
+        key = self._key(bucket, blob_name)
+        entry = CacheEntry(bucket, blob_name, generation, digest, len(data))
+        with self._lock:
+            self._drop(key)
+            # Under the lock so a concurrent eviction cannot unlink the object
+            # between this check and the ref being added
+            path = self._object_path(digest)
+            if not os.path.exists(path):
+                self._write_atomic(path, data)
+            self._add(key, entry)
+            self._write_atomic(
+                self._ref_path(key), json.dumps(asdict(entry)).encode("utf-8")
+            )
+            self._evict()
+
+    def discard(self, bucket: str, blob_name: str):
+        with self._lock:
+            self._drop(self._key(bucket, blob_name))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+            }
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return b""
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[:]
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        # Readers see either no file or the whole file, never a partial one
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _add(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        if not self._refcounts[entry.digest]:
+            self._object_sizes[entry.digest] = entry.size
+            self._bytes += entry.size
+        self._refcounts[entry.digest] += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._remove_file(self._ref_path(key))
+        self._refcounts[entry.digest] -= 1
+        if not self._refcounts[entry.digest]:
+            del self._refcounts[entry.digest]
+            self._bytes -= self._object_sizes.pop(entry.digest)
+            self._remove_file(self._object_path(entry.digest))
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def _load(self):
+        refs = []
+        for ref in os.scandir(self._refs_dir):
+            if ref.name.endswith(".tmp"):
+                self._remove_file(ref.path)
+                continue
+            try:
+                with open(ref.path, "rb") as file:
+                    entry = CacheEntry(**json.loads(file.read()))
+                refs.append((ref.stat().st_mtime, entry))
+            except (OSError, ValueError, TypeError):
+                self._remove_file(ref.path)
+
+        # Least recently written first, matching the LRU order
+        for _, entry in sorted(refs, key=lambda item: item[0]):
+            if os.path.exists(self._object_path(entry.digest)):
+                self._add(self._key(entry.bucket, entry.blob_name), entry)
+            else:
+                self._remove_file(
+                    self._ref_path(self._key(entry.bucket, entry.blob_name))
+                )
+
+        # Objects no ref points to, e.g. after a crash between the two writes
+        for prefix in os.scandir(self._objects_dir):
+            if not prefix.is_dir():
+                continue
+            for obj in os.scandir(prefix.path):
+                if obj.name not in self._refcounts:
+                    self._remove_file(obj.path)
+        self._evict()
+        if self._entries:
+            CustomLogger.create_log(
+                "info",
+                f"Loaded {len(self._entries)} cached blobs ({self._bytes} bytes)"
+                f" from {self.root}",
+            )
+
+
+@lru_cache(maxsize=None)
+def get_disk_cache() -> DiskCache:
+    # One cache per process, shared by every bucket and the OCR service
+    return DiskCache(settings.STORAGE_CACHE_DIR, settings.STORAGE_CACHE_MAX_BYTES)
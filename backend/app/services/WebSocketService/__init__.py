@@ -1,51 +1,102 @@
 # backend/app/services/WebSocketService/__init__.py
 
+import asyncio
 import json
 import uuid
-from typing import Dict
+from collections import deque
+from typing import Deque, Dict, Optional, Set
 
 from fastapi import WebSocket
 
+from app.config import settings
 from app.utils.logger import CustomLogger
 
 
+class FrontendConnection:
+    """Outbound side of one frontend socket.
+
+    Messages wait in a bounded queue that a dedicated writer task drains, so
+    a slow browser only ever delays its own messages.
+    """
+
+    def __init__(
+        self,
+        frontend_id: str,
+        websocket: WebSocket,
+        queue_size: int,
+        session_id: Optional[str] = None,
+    ):
+        self.frontend_id = frontend_id
+        self.websocket = websocket
+        # Scan session this frontend follows, None for every session
+        self.session_id = session_id
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._queue: Deque[str] = deque()
+        self._ready = asyncio.Event()
+        self._writer = asyncio.create_task(self._write())
+
+    def offer(self, text: str, policy: str) -> bool:
+        """Queue an already serialized message; False means the client is too
+        far behind and, under the disconnect policy, should be dropped."""
+        if len(self._queue) >= self.queue_size:
+            if policy == "disconnect":
+                return False
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append(text)
+        self._ready.set()
+        return True
+
+    async def _write(self):
+        try:
+            while True:
+                await self._ready.wait()
+                while self._queue:
+                    await self.websocket.send_text(self._queue.popleft())
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            CustomLogger.create_log(
+                "error", f"Error sending to frontend {self.frontend_id}: {str(e)}"
+            )
+            WebSocketService.disconnect_frontend(self.frontend_id)
+
+    def stop(self):
+        self._writer.cancel()
+
+
 class WebSocketService:
     _camera_connections: Dict[str, WebSocket] = {}
-    _frontend_connections: Dict[str, WebSocket] = {}
-    _lock = False
+    _frontend_connections: Dict[str, FrontendConnection] = {}
+    _closing: Set[asyncio.Task] = set()
 
     @classmethod
     async def connect_camera(cls, websocket: WebSocket) -> str:
+        # Several cameras may be connected; ScanSessionService keeps it to one
+        # camera per scan session
         try:
-            if not cls._lock:
-                cls._lock = True
-                camera_id = str(uuid.uuid4())
-                await websocket.accept()
-                cls._camera_connections[camera_id] = websocket
-                CustomLogger.create_log("info", f"Camera connected: {camera_id}")
-                return camera_id
-            else:
-                CustomLogger.create_log(
-                    "warning",
-                    "Camera connection rejected - another camera connection is active",
-                )
-                await websocket.close(
-                    code=1008, reason="Another camera connection is active"
-                )
-                return None
+            camera_id = str(uuid.uuid4())
+            await websocket.accept()
+            cls._camera_connections[camera_id] = websocket
+            CustomLogger.create_log("info", f"Camera connected: {camera_id}")
+            return camera_id
         except Exception as e:
             CustomLogger.create_log("error", f"Error in camera connection: {str(e)}")
             await websocket.close(code=1011, reason=str(e))
             return None
-        finally:
-            cls._lock = False
 
     @classmethod
-    async def connect_frontend(cls, websocket: WebSocket) -> str:
+    async def connect_frontend(
+        cls, websocket: WebSocket, session_id: Optional[str] = None
+    ) -> str:
         try:
             frontend_id = str(uuid.uuid4())
             await websocket.accept()
-            cls._frontend_connections[frontend_id] = websocket
+            cls._frontend_connections[frontend_id] = FrontendConnection(
+                frontend_id, websocket, settings.FRONTEND_QUEUE_SIZE, session_id
+            )
             CustomLogger.create_log("info", f"Frontend connected: {frontend_id}")
             return frontend_id
         except Exception as e:
@@ -65,26 +116,67 @@ class WebSocketService:
     @classmethod
     def disconnect_frontend(cls, frontend_id: str):
         try:
-            if frontend_id in cls._frontend_connections:
-                del cls._frontend_connections[frontend_id]
+            connection = cls._frontend_connections.pop(frontend_id, None)
+            if connection is not None:
+                connection.stop()
                 CustomLogger.create_log("info", f"Frontend disconnected: {frontend_id}")
         except Exception as e:
             CustomLogger.create_log("error", f"Error disconnecting frontend: {str(e)}")
 
     @classmethod
-    async def broadcast_to_frontend(cls, message: dict):
+    def send_to_frontend(cls, frontend_id: str, message: dict):
+        # Goes through the same queue as broadcasts, so messages stay in order
+        connection = cls._frontend_connections.get(frontend_id)
+        if connection is not None and not connection.offer(
+            json.dumps(message), settings.FRONTEND_SLOW_CLIENT_POLICY
+        ):
+            cls._drop_slow_frontend(frontend_id)
+
+    @classmethod
+    async def broadcast_to_frontend(
+        cls, message: dict, session_id: Optional[str] = None
+    ):
+        """Queue message for every frontend without waiting for any send.
+
+        With a session_id the message is tagged with it and only reaches
+        frontends following that session or all sessions. The message is
+        serialized once. A client whose queue is full loses its oldest
+        message, or is disconnected under the "disconnect"
+        FRONTEND_SLOW_CLIENT_POLICY.
+        """
         if not cls._frontend_connections:
             return
 
-        disconnected = []
-        for frontend_id, connection in cls._frontend_connections.items():
-            try:
-                await connection.send_text(json.dumps(message))
-            except Exception as e:
-                CustomLogger.create_log(
-                    "error", f"Error broadcasting to frontend {frontend_id}: {str(e)}"
-                )
-                disconnected.append(frontend_id)
-
-        for frontend_id in disconnected:
-            cls.disconnect_frontend(frontend_id)
+        if session_id is not None:
+            message = {**message, "session_id": session_id}
+        text = json.dumps(message)
+        policy = settings.FRONTEND_SLOW_CLIENT_POLICY
+        slow = [
+            frontend_id
+            for frontend_id, connection in list(cls._frontend_connections.items())
+            if connection.session_id in (None, session_id)
+            and not connection.offer(text, policy)
+        ]
+        for frontend_id in slow:
+            cls._drop_slow_frontend(frontend_id)
+
+    @classmethod
+    def _drop_slow_frontend(cls, frontend_id: str):
+        connection = cls._frontend_connections.get(frontend_id)
+        if connection is None:
+            return
+        CustomLogger.create_log(
+            "warning", f"Disconnecting frontend {frontend_id}, it fell too far behind"
+        )
+        cls.disconnect_frontend(frontend_id)
+        # Closing can wait on the slow client too, so it must not block the caller
+        task = asyncio.create_task(cls._close_quietly(connection.websocket))
+        cls._closing.add(task)
+        task.add_done_callback(cls._closing.discard)
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013, reason="Client too slow")
+        except Exception:
+            pass
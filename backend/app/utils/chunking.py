@@ -0,0 +1,127 @@
+# backend/app/utils/chunking.py
+
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from app.config import settings
+
+PARAGRAPH_SEPARATOR = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class Chunk:
+    text: str
+    chunk_index: int
+    # Character offsets of the chunk within the page text
+    char_start: int
+    char_end: int
+    token_count: int
+
+
+def estimate_tokens(text: str) -> int:
+    # Whitespace words are a close enough budget for text-embedding-005
+    return len(text.split())
+
+
+def split_paragraphs(text: str) -> List[Tuple[int, int]]:
+    """Return (start, end) character spans of the non-empty paragraphs in text."""
+    spans = []
+    start = 0
+    for separator in PARAGRAPH_SEPARATOR.finditer(text):
+        spans.append((start, separator.start()))
+        start = separator.end()
+    spans.append((start, len(text)))
+
+    trimmed = []
+    for start, end in spans:
+        paragraph = text[start:end]
+        if not paragraph.strip():
+            continue
+        start += len(paragraph) - len(paragraph.lstrip())
+        end -= len(paragraph) - len(paragraph.rstrip())
+        trimmed.append((start, end))
+    return trimmed
+
+
+def _split_long_paragraph(
+    text: str, start: int, end: int, max_tokens: int, overlap_tokens: int
+) -> List[Tuple[int, int]]:
+    words = [
+        (start + match.start(), start + match.end())
+        for match in re.finditer(r"\S+", text[start:end])
+    ]
+    step = max_tokens - overlap_tokens
+    windows = []
+    for first in range(0, len(words), step):
+        window = words[first : first + max_tokens]
+        windows.append((window[0][0], window[-1][1]))
+        if first + max_tokens >= len(words):
+            break
+    return windows
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = settings.CHUNK_MAX_TOKENS,
+    overlap_tokens: int = settings.CHUNK_OVERLAP_TOKENS,
+) -> List[Chunk]:
+    """Split page text into overlapping chunks of at most max_tokens.
+
+    Chunks are built from whole paragraphs where possible, and consecutive
+    chunks repeat trailing paragraphs up to overlap_tokens. Paragraphs longer
+    than max_tokens are split into overlapping word windows. overlap_tokens
+    must be less than max_tokens.
+    """
+    if not 0 <= overlap_tokens < max_tokens:
+        raise ValueError(
+            f"overlap_tokens must be in [0, {max_tokens}), got {overlap_tokens}"
+        )
+    # Paragraph spans, with oversized paragraphs already cut into windows
+    spans = []
+    for start, end in split_paragraphs(text):
+        if estimate_tokens(text[start:end]) > max_tokens:
+            spans.extend(
+                _split_long_paragraph(text, start, end, max_tokens, overlap_tokens)
+            )
+        else:
+            spans.append((start, end))
+
+    token_counts = [estimate_tokens(text[start:end]) for start, end in spans]
+    chunks = []
+    first = 0
+    while first < len(spans):
+        last = first
+        tokens = token_counts[first]
+        while last + 1 < len(spans) and tokens + token_counts[last + 1] <= max_tokens:
+            last += 1
+            tokens += token_counts[last]
+
+        char_start, char_end = spans[first][0], spans[last][1]
+        chunks.append(
+            Chunk(
+                text=text[char_start:char_end],
+                chunk_index=len(chunks),
+                char_start=char_start,
+                char_end=char_end,
+                token_count=tokens,
+            )
+        )
+        if last + 1 >= len(spans):
+            break
+
+        # Carry trailing paragraphs into the next chunk, as long as they still
+        # leave room for the next paragraph and the chunk moves forward
+        next_first = last + 1
+        overlap = 0
+        while (
+            next_first - 1 > first
+            and overlap + token_counts[next_first - 1] <= overlap_tokens
+            and overlap + token_counts[next_first - 1] + token_counts[last + 1]
+            <= max_tokens
+        ):
+            next_first -= 1
+            overlap += token_counts[next_first]
+        first = next_first
+
+    return chunks
@@ -0,0 +1,101 @@
+# backend/app/utils/image.py
+
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def phash(frame: np.ndarray, hash_size: int) -> str:
+    """Perceptual (DCT) hash of a BGR or grayscale frame as a hex string.
+
+    The frame is shrunk to a 4 * hash_size square, and each of the
+    hash_size * hash_size lowest-frequency DCT coefficients becomes one bit
+    set when it is above their median. Unlike a difference hash this stays
+    stable on the flat paper areas where sensor noise flips neighbour
+    comparisons.
+    """
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    side = hash_size * 4
+    small = cv2.resize(frame, (side, side), interpolation=cv2.INTER_AREA)
+    coefficients = cv2.dct(small.astype(np.float32))[:hash_size, :hash_size]
+    bits = coefficients > np.median(coefficients)
+    return np.packbits(bits).tobytes().hex()
+
+
+def closest_hash(
+    image_hash: str, candidates: List[Tuple[str, str]]
+) -> Optional[Tuple[str, int]]:
+    """Return (key, hamming distance) of the candidate closest to image_hash.
+
+    candidates are (key, hash) pairs produced by phash with the same size.
+    """
+    if not candidates:
+        return None
+
+    target = np.frombuffer(bytes.fromhex(image_hash), dtype=np.uint8)
+    others = np.frombuffer(
+        b"".join(bytes.fromhex(candidate) for _, candidate in candidates),
+        dtype=np.uint8,
+    ).reshape(len(candidates), -1)
+    distances = np.unpackbits(others ^ target, axis=1).sum(axis=1)
+    best = int(np.argmin(distances))
+    return candidates[best][0], int(distances[best])
+
+
+def resize_to_width(frame: np.ndarray, width: int) -> np.ndarray:
+    """Downscale frame to width keeping its aspect ratio. Frames already
+    narrower than width are returned unchanged, never upscaled."""
+    height, current_width = frame.shape[:2]
+    if current_width <= width:
+        return frame
+    size = (width, max(1, round(height * width / current_width)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def decode_image(data: bytes) -> np.ndarray:
+    """Decode encoded image bytes, e.g. a capture JPEG, to a BGR frame."""
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise Exception("Failed to decode image")
+    return frame
+
+
+def encode_image(frame: np.ndarray, image_format: str, quality: int) -> bytes:
+    """Encode frame as "webp" or "jpg" at the given 1-100 quality."""
+    if image_format == "webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+    elif image_format == "jpg":
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    else:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    encoded, buffer = cv2.imencode(f".{image_format}", frame, params)
+    if not encoded:
+        raise Exception(f"Failed to encode {image_format} image")
+    return buffer.tobytes()
+
+
+def to_gray(frame: np.ndarray, width: Optional[int] = None) -> np.ndarray:
+    """Grayscale copy of a BGR frame, shrunk to width if given."""
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if width is not None:
+        frame = resize_to_width(frame, width)
+    return frame
+
+
+def sharpness(frame: np.ndarray, width: Optional[int] = None) -> float:
+    """Variance of the Laplacian of a BGR or grayscale frame.
+
+    Motion blur and defocus remove the edges the Laplacian responds to, so a
+    higher value means a sharper frame. The grayscale frame is shrunk to
+    width, if given, which keeps the ranking while scoring far fewer pixels.
+    """
+    return float(cv2.Laplacian(to_gray(frame, width), cv2.CV_32F).var())
+
+
+def frame_difference(previous: np.ndarray, current: np.ndarray) -> float:
+    """Mean absolute difference of two same-sized grayscale frames, from 0
+    for identical frames to 255."""
+    return float(cv2.absdiff(previous, current).mean())
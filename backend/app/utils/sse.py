@@ -0,0 +1,140 @@
+# backend/app/utils/sse.py
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from fastapi import Request
+
+from app.config import settings
+from app.utils.logger import CustomLogger
+
+# SSE comment line, ignored by EventSource and by the frontend's data: parser
+HEARTBEAT = ": keep-alive\n\n"
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+_END = object()
+
+
+class _Failure:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def sse_frame(event: dict) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+
+async def _watch_disconnect(request: Request, interval: float):
+    while not await request.is_disconnected():
+        await asyncio.sleep(interval)
+
+
+async def stream_events(
+    request: Request,
+    events: AsyncIterator[dict],
+    coalesce_type: str = "response",
+    coalesce_field: str = "content",
+    window_seconds: float = settings.SSE_COALESCE_WINDOW_SECONDS,
+    max_chars: int = settings.SSE_COALESCE_MAX_CHARS,
+    heartbeat_seconds: float = settings.SSE_HEARTBEAT_SECONDS,
+    buffer_size: int = settings.SSE_BUFFER_SIZE,
+    poll_seconds: float = settings.SSE_DISCONNECT_POLL_SECONDS,
+) -> AsyncIterator[str]:
+    """Turn an async iterator of event dicts into SSE frames for a client.
+
+    Consecutive coalesce_type events are merged into one frame by
+    concatenating their coalesce_field, flushed once window_seconds have
+    passed since the first merged event or max_chars have built up. Any
+    other event flushes the merged text and is sent as its own frame, and so
+    does an exception from events, before it is re-raised.
+
+    events runs in its own task and hands over at most buffer_size events,
+    so a slow client stops it from being read any further. A keep-alive
+    comment goes out after heartbeat_seconds without a frame, and when the
+    client disconnects events is cancelled and closed, which stops the
+    upstream LLM stream.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+
+    async def produce():
+        try:
+            async for event in events:
+                await queue.put(event)
+            await queue.put(_END)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(_Failure(e))
+        finally:
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    loop = asyncio.get_running_loop()
+    producer = asyncio.create_task(produce())
+    watcher = asyncio.create_task(_watch_disconnect(request, poll_seconds))
+    getter = None
+    pending = []
+    pending_chars = 0
+    deadline = None
+
+    def flush() -> str:
+        nonlocal pending, pending_chars, deadline
+        frame = sse_frame({"type": coalesce_type, coalesce_field: "".join(pending)})
+        pending, pending_chars, deadline = [], 0, None
+        return frame
+
+    try:
+        while True:
+            if getter is None:
+                getter = asyncio.ensure_future(queue.get())
+            timeout = (
+                heartbeat_seconds
+                if deadline is None
+                else max(deadline - loop.time(), 0)
+            )
+            done, _ = await asyncio.wait(
+                {getter, watcher}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if watcher in done:
+                CustomLogger.create_log(
+                    "info", "Client disconnected, cancelling the event stream"
+                )
+                return
+            if getter not in done:
+                yield flush() if pending else HEARTBEAT
+                continue
+
+            event, getter = getter.result(), None
+            if event is _END:
+                if pending:
+                    yield flush()
+                return
+            if isinstance(event, _Failure):
+                # Text received before the failure still reaches the client
+                if pending:
+                    yield flush()
+                raise event.error
+
+            if event.get("type") == coalesce_type:
+                chunk = event.get(coalesce_field) or ""
+                pending.append(chunk)
+                pending_chars += len(chunk)
+                if deadline is None:
+                    deadline = loop.time() + window_seconds
+                if pending_chars >= max_chars or loop.time() >= deadline:
+                    yield flush()
+            else:
+                if pending:
+                    yield flush()
+                yield sse_frame(event)
+    finally:
+        for task in (getter, producer, watcher):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(
+            *(task for task in (getter, producer, watcher) if task is not None),
+            return_exceptions=True,
+        )
@@ -2,32 +2,162 @@
 
 import asyncio
 import json
+import time
+from typing import Optional
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 
 from app.config import settings
-from app.database.qdrant import QdrantDatabase
-from app.services.AIService import AIService
-from app.services.ClickPictureService import ClickPictureService
-from app.services.OCRService import OCRService
+from app.database.qdrant.filters import version_scope
+from app.services.IngestionService import IngestionJob
+from app.services.ScanSessionService import ScanSession
+from app.services.ServiceContainer import ServiceContainer, get_services
 from app.services.WebSocketService import WebSocketService
 from app.utils.logger import CustomLogger
 
 router = APIRouter()
-click_picture_service = ClickPictureService(settings.GCP_BUCKET_NAME)
-ocr_service = OCRService()
-ai_service = AIService()
-qdrant_db = QdrantDatabase()
+
+
+async def capture_page(
+    websocket: WebSocket,
+    services: ServiceContainer,
+    session: ScanSession,
+    newest: Optional[int] = None,
+    camera: bool = True,
+) -> dict:
+    """Capture a page and queue it for ingestion, reporting failures and
+    duplicates to the frontend, and to the camera unless camera is False."""
+    result = await asyncio.to_thread(
+        session.click_picture_service.capture_picture, newest
+    )
+    if not result["success"]:
+        response = {
+            "status": "error",
+            "message": f"Failed to capture picture: {result['error']}",
+        }
+        if camera:
+            await websocket.send_text(json.dumps(response))
+        await WebSocketService.broadcast_to_frontend(
+            response, session_id=session.session_id
+        )
+        return result
+
+    if result["duplicate"]:
+        CustomLogger.create_log(
+            "warning",
+            f"Skipping capture, same as page {result['duplicate_of']}",
+        )
+        response = {
+            "action": "duplicate",
+            "page_number": result["duplicate_of"],
+            "distance": result["distance"],
+        }
+        if camera:
+            await websocket.send_text(json.dumps(response))
+        await WebSocketService.broadcast_to_frontend(
+            response, session_id=session.session_id
+        )
+        return result
+
+    CustomLogger.create_log("info", f"Captured picture: {result['blob_name']}")
+
+    # OCR, cleanup and indexing run on the ingestion workers
+    await services.ingestion_service.enqueue(
+        IngestionJob(
+            page_number=result["page_number"],
+            blob_name=result["blob_name"],
+            image_bytes=result["image_bytes"],
+            websocket=websocket,
+            session_id=session.session_id,
+            notebook_id=session.notebook_id,
+            notebook_version=services.qdrant_db.notebook_version(
+                version_scope(session.notebook_id, session.session_id)
+            ),
+        )
+    )
+
+    return result
+
+
+async def auto_capture(
+    websocket: WebSocket, services: ServiceContainer, session: ScanSession
+) -> dict:
+    """Wait for the page to settle and capture it, returning the flip reply."""
+    started = time.perf_counter()
+    settled = False
+    try:
+        settled = await asyncio.to_thread(session.click_picture_service.wait_for_settle)
+        settle_ms = round((time.perf_counter() - started) * 1000)
+        if not settled:
+            CustomLogger.create_log(
+                "warning",
+                f"Page did not settle within {settings.CAMERA_SETTLE_TIMEOUT_SECONDS}s, capturing anyway",
+            )
+        result = await capture_page(
+            websocket,
+            services,
+            session,
+            newest=settings.CAMERA_SETTLE_FRAMES if settled else None,
+            camera=False,
+        )
+    except Exception as e:
+        CustomLogger.create_log("error", f"Auto capture failed: {str(e)}")
+        settle_ms = round((time.perf_counter() - started) * 1000)
+        result = {"success": False, "error": str(e)}
+
+    response = {
+        "action": "flip",
+        "settled": settled,
+        "settle_ms": settle_ms,
+        "captured": result["success"] and not result["duplicate"],
+    }
+    if not result["success"]:
+        response["error"] = result["error"]
+    elif result["duplicate"]:
+        response["duplicate_of"] = result["duplicate_of"]
+    return response
 
 
 @router.websocket("/click-picture")
-async def camera_websocket_endpoint(websocket: WebSocket):
+async def camera_websocket_endpoint(
+    websocket: WebSocket, services: ServiceContainer = Depends(get_services)
+):
     camera_id = None
+    session = None
+    ingestion_service = services.ingestion_service
 
     try:
+        # ?session_id=&notebook_id=&camera_index= identify the scanning station;
+        # a session ID is generated when none is given
+        params = websocket.query_params
+        try:
+            camera_index = params.get("camera_index")
+            session = services.scan_sessions.open(
+                session_id=params.get("session_id"),
+                notebook_id=params.get("notebook_id"),
+                camera_index=int(camera_index) if camera_index else None,
+            )
+        except ValueError as e:
+            await websocket.close(code=1008, reason=str(e))
+            return
+        if session is None:
+            CustomLogger.create_log(
+                "warning",
+                f"Camera connection rejected - session {params.get('session_id')} already has a camera",
+            )
+            await websocket.close(
+                code=1008, reason="Another camera is connected to this session"
+            )
+            return
+
+        click_picture_service = session.click_picture_service
         camera_id = await WebSocketService.connect_camera(websocket)
         if not camera_id:
             return
+        session.camera_id = camera_id
+        await websocket.send_text(
+            json.dumps({"action": "session", **session.describe()})
+        )
 
         while True:
             try:
@@ -41,78 +171,39 @@ async def camera_websocket_endpoint(websocket: WebSocket):
                         )
                         return
 
-                    qdrant_db.delete_all_documents()
-                    click_picture_service.delete_captures()
+                    # Only this session's notebook and captures start over; the
+                    # old ones are hidden now and deleted in the background
+                    await services.cleanup_service.reset_session(session)
 
-                    response = {"action": "start"}
+                    response = {"action": "start", **session.describe()}
                     await websocket.send_text(json.dumps(response))
-                    await WebSocketService.broadcast_to_frontend(response)
+                    await WebSocketService.broadcast_to_frontend(
+                        response, session_id=session.session_id
+                    )
 
                 elif message.get("action") == "click":
-                    result = click_picture_service.capture_picture()
-                    if not result["success"]:
-                        response = {
-                            "status": "error",
-                            "message": f"Failed to capture picture: {result['error']}",
-                        }
-                        await websocket.send_text(json.dumps(response))
-                        await WebSocketService.broadcast_to_frontend(response)
-                        continue
-
-                    try:
-                        CustomLogger.create_log(
-                            "info", f"Captured picture: {result['file_path']}"
-                        )
-
-                        page_number = str(
-                            result["file_path"]
-                            .split("/")[-1]
-                            .split(".")[0]
-                            .split("_")[1]
-                        )
-                        scanning_response = {
-                            "action": "scanning",
-                            "page_number": page_number,
-                        }
-                        await WebSocketService.broadcast_to_frontend(scanning_response)
-
-                        ocr_text = ocr_service.ocr_image(result["file_path"])
-                        CustomLogger.create_log("info", f"OCR Text: {ocr_text}")
-
-                        cleaned_text = await ai_service.cleanup_ocr_text(ocr_text)
-                        CustomLogger.create_log("info", f"Cleaned Text: {cleaned_text}")
-                        qdrant_db.add_document(
-                            cleaned_text, page_number, result["file_path"]
-                        )
-
-                        processing_response = {
-                            "action": "processing",
-                            "page_number": page_number,
-                        }
-                        await WebSocketService.broadcast_to_frontend(
-                            processing_response
-                        )
-
-                        response = {
-                            "action": "click",
-                            "page_number": page_number,
-                            "ocr_text": ocr_text,
-                        }
-                    except Exception as e:
-                        response = {
-                            "status": "error",
-                            "message": f"Failed to process image: {str(e)}",
-                            "file_path": result["file_path"],
-                        }
-
+                    await capture_page(websocket, services, session)
+
+                elif message.get("action") == "auto":
+                    # Sent by the Pi after turning a page: capture as soon as
+                    # the page lies still, then let the Pi turn the next one.
+                    # Exactly one flip answers each request, echoing its
+                    # request_id and carrying any failure or duplicate.
+                    response = await auto_capture(websocket, services, session)
+                    response["request_id"] = message.get("request_id")
                     await websocket.send_text(json.dumps(response))
-                    await WebSocketService.broadcast_to_frontend(response)
 
                 elif message.get("action") == "end":
-                    response = {"action": "end"}
-                    await WebSocketService.broadcast_to_frontend(response)
+                    # Let pages still in the pipeline finish before the frontend moves on
+                    await ingestion_service.join(session.session_id)
+
+                    response = {"action": "end", **session.describe()}
+                    await WebSocketService.broadcast_to_frontend(
+                        response, session_id=session.session_id
+                    )
 
-                    click_picture_service.release_camera()
+                    # Also writes the final capture manifest
+                    await asyncio.to_thread(click_picture_service.close)
 
                     await asyncio.sleep(2)
                     await websocket.close()
@@ -120,7 +211,9 @@ async def camera_websocket_endpoint(websocket: WebSocket):
                 else:
                     response = {"status": "error", "message": "Invalid action"}
                     await websocket.send_text(json.dumps(response))
-                    await WebSocketService.broadcast_to_frontend(response)
+                    await WebSocketService.broadcast_to_frontend(
+                        response, session_id=session.session_id
+                    )
             except WebSocketDisconnect:
                 raise
             except Exception as e:
@@ -129,11 +222,13 @@ async def camera_websocket_endpoint(websocket: WebSocket):
                 await websocket.send_text(json.dumps(response))
 
     except WebSocketDisconnect:
-        click_picture_service.release_camera()
+        pass
     except Exception as e:
         CustomLogger.create_log("error", f"Error in websocket connection: {str(e)}")
-        click_picture_service.release_camera()
     finally:
+        # Closing the session releases its camera
+        if session is not None:
+            await services.scan_sessions.close(session.session_id)
         if camera_id:
             WebSocketService.disconnect_camera(camera_id)
         try:
@@ -14,7 +14,10 @@ router = APIRouter()
 async def frontend_websocket_endpoint(websocket: WebSocket):
     frontend_id = None
     try:
-        frontend_id = await WebSocketService.connect_frontend(websocket)
+        # Optional ?session_id= limits updates to one scan session
+        frontend_id = await WebSocketService.connect_frontend(
+            websocket, websocket.query_params.get("session_id")
+        )
         if not frontend_id:
             return
 
@@ -22,17 +25,17 @@ async def frontend_websocket_endpoint(websocket: WebSocket):
             "info", f"Frontend client connected with ID: {frontend_id}"
         )
 
-        await websocket.send_text(
-            json.dumps(
-                {
-                    "status": "connected",
-                    "message": "Frontend WebSocket connected successfully",
-                    "client_id": frontend_id,
-                }
-            )
+        WebSocketService.send_to_frontend(
+            frontend_id,
+            {
+                "status": "connected",
+                "message": "Frontend WebSocket connected successfully",
+                "client_id": frontend_id,
+            },
         )
         CustomLogger.create_log(
-            "info", f"Sent initial connection success message to frontend {frontend_id}"
+            "info",
+            f"Queued initial connection success message to frontend {frontend_id}",
         )
 
         while True:
@@ -48,9 +51,9 @@ async def frontend_websocket_endpoint(websocket: WebSocket):
                     "message": "Message received by frontend",
                     "client_id": frontend_id,
                 }
-                await websocket.send_text(json.dumps(response))
+                WebSocketService.send_to_frontend(frontend_id, response)
                 CustomLogger.create_log(
-                    "info", f"Sent acknowledgment message to frontend {frontend_id}"
+                    "info", f"Queued acknowledgment message to frontend {frontend_id}"
                 )
 
             except WebSocketDisconnect:
@@ -2,9 +2,9 @@
 
 from fastapi import APIRouter
 
-from app.websocket.endpoints import frontend, camera    
+from app.websocket.endpoints import frontend, camera
 
 websocket_router = APIRouter()
 
 websocket_router.include_router(frontend.router, tags=["frontend"])
-websocket_router.include_router(camera.router, tags=["camera"])
\ No newline at end of file
+websocket_router.include_router(camera.router, tags=["camera"])
@@ -0,0 +1,120 @@
+# backend/benchmarks/batch_ocr.py
+
+# Compares page-by-page OCR with batched, concurrent OCR against a local fake
+# Vision server. The fake server answers images:annotate over REST after a
+# fixed round-trip delay, so the numbers reflect request count and overlap
+# rather than real recognition time.
+#
+#   python -m benchmarks.batch_ocr --pages 60 --latency 0.3
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from google.api_core.client_options import ClientOptions  # noqa: E402
+from google.auth.credentials import AnonymousCredentials  # noqa: E402
+from google.cloud import vision  # noqa: E402
+
+from app.services.OCRService import OCRService  # noqa: E402
+
+FAKE_PAGE = {
+    "fullTextAnnotation": {
+        "pages": [
+            {
+                "blocks": [
+                    {
+                        "paragraphs": [
+                            {
+                                "words": [
+                                    {"symbols": [{"text": c} for c in "notes"]},
+                                    {"symbols": [{"text": c} for c in "page"]},
+                                ]
+                            }
+                        ]
+                    }
+                ]
+            }
+        ]
+    }
+}
+
+
+def start_fake_vision(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            payload = json.dumps(
+                {"responses": [FAKE_PAGE for _ in body["requests"]]}
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def write_pages(directory: str, pages: int):
+    frame = np.full((1080, 1920, 3), 255, dtype=np.uint8)
+    for page in range(1, pages + 1):
+        cv2.imwrite(os.path.join(directory, f"capture_{page}.jpg"), frame)
+
+
+async def main(pages: int, latency: float, batch_size: int, concurrency: int):
+    server = start_fake_vision(latency)
+    client = vision.ImageAnnotatorClient(
+        transport="rest",
+        credentials=AnonymousCredentials(),
+        client_options=ClientOptions(
+            api_endpoint=f"http://127.0.0.1:{server.server_port}"
+        ),
+    )
+    ocr_service = OCRService(client=client)
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_pages(directory, pages)
+
+        started = time.perf_counter()
+        for image_path in ocr_service._list_images(directory):
+            ocr_service.ocr_image(image_path)
+        sequential = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await ocr_service.process_documents(directory, batch_size, concurrency)
+        batched = time.perf_counter() - started
+
+    server.shutdown()
+    print(f"pages:                {pages}")
+    print(f"round trip latency:   {latency * 1000:.0f} ms")
+    print(f"sequential:           {sequential:.2f} s")
+    label = f"batched ({batch_size} x {concurrency}):"
+    print(f"{label:<22}{batched:.2f} s")
+    print(f"speedup:              {sequential / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.latency, args.batch_size, args.concurrency))
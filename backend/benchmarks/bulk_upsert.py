@@ -0,0 +1,81 @@
+# backend/benchmarks/bulk_upsert.py
+
+# Points per second for one-document-at-a-time indexing versus
+# add_documents_bulk. Runs against Qdrant's in-memory local mode by default
+# (pass --url for a real server) with deterministic fake embeddings, so only
+# the upsert path is measured.
+#
+#   python -m benchmarks.bulk_upsert --documents 2000
+
+import argparse
+import asyncio
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from langchain_core.documents import Document  # noqa: E402
+from langchain_core.embeddings import DeterministicFakeEmbedding  # noqa: E402
+from qdrant_client import AsyncQdrantClient  # noqa: E402
+
+from app.database.qdrant import QdrantDatabase  # noqa: E402
+
+
+class FloatEmbeddings(DeterministicFakeEmbedding):
+    # Plain floats like Vertex returns, instead of numpy scalars
+    def _get_embedding(self, seed: int):
+        return [float(value) for value in super()._get_embedding(seed)]
+
+
+def make_documents(count: int):
+    return [
+        Document(
+            page_content=f"Notebook page {i} chunk about topic {i % 37}",
+            metadata={"page_number": str(i // 4 + 1), "chunk_index": i % 4},
+        )
+        for i in range(count)
+    ]
+
+
+async def fresh_database(url: str) -> QdrantDatabase:
+    client = AsyncQdrantClient(url=url) if url else AsyncQdrantClient(":memory:")
+    qdrant_db = QdrantDatabase(client=client, embeddings=FloatEmbeddings(size=768))
+    await qdrant_db.initialize()
+    await qdrant_db.delete_all_documents()
+    return qdrant_db
+
+
+async def main(url: str, count: int, batch_size: int, parallel: int):
+    documents = make_documents(count)
+
+    qdrant_db = await fresh_database(url)
+    started = time.perf_counter()
+    for document in documents:
+        await qdrant_db.add_documents_bulk([document], wait=True)
+    single = count / (time.perf_counter() - started)
+    await qdrant_db.close()
+
+    qdrant_db = await fresh_database(url)
+    started = time.perf_counter()
+    await qdrant_db.add_documents_bulk(
+        documents, batch_size=batch_size, parallel=parallel
+    )
+    bulk = count / (time.perf_counter() - started)
+    await qdrant_db.close()
+
+    print(f"documents:            {count}")
+    print(f"one at a time:        {single:,.0f} points/s")
+    label = f"bulk ({batch_size} x {parallel}):"
+    print(f"{label:<22}{bulk:,.0f} points/s")
+    print(f"speedup:              {bulk / single:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="", help="Qdrant URL, in-memory if empty")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--parallel", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.documents, args.batch_size, args.parallel))
@@ -0,0 +1,53 @@
+# backend/benchmarks/chat_concurrency.py
+
+# Load test for /api/chat against a running backend. Fires N chat requests at
+# once and reports when each one received its source_images event, which is
+# sent right after retrieval. If retrieval blocked the event loop, the first
+# events would arrive one after another instead of together.
+#
+#   fastapi run app/main.py
+#   python -m benchmarks.chat_concurrency --concurrency 20
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def first_event_latency(client: httpx.AsyncClient, query: str) -> float:
+    started = time.perf_counter()
+    async with client.stream("POST", "/api/chat", json={"query": query}) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                return time.perf_counter() - started
+    return time.perf_counter() - started
+
+
+async def main(base_url: str, concurrency: int, query: str):
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        # Warm up connections and caches so only retrieval is measured
+        single = await first_event_latency(client, query)
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(
+            *(first_event_latency(client, f"{query} ({i})") for i in range(concurrency))
+        )
+        wall = time.perf_counter() - started
+
+    print(f"single request:           {single * 1000:.0f} ms")
+    print(f"concurrent requests:      {concurrency}")
+    print(f"wall time:                {wall * 1000:.0f} ms")
+    print(f"median first event:       {statistics.median(latencies) * 1000:.0f} ms")
+    print(f"slowest first event:      {max(latencies) * 1000:.0f} ms")
+    print(f"serialized would take:    {single * concurrency * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--query", default="What are the key points in my notes?")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.concurrency, args.query))
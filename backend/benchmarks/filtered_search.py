@@ -0,0 +1,112 @@
+# backend/benchmarks/filtered_search.py
+
+# Dense search latency on a large synthetic collection with and without
+# payload filters (notebook, session, page range) and with pagination. Runs
+# against Qdrant's in-memory local mode by default, which scans instead of
+# using payload indexes; pass --url to measure a real server, where the
+# indexes created by QdrantDatabase apply.
+#
+#   python -m benchmarks.filtered_search --documents 20000 --notebooks 100
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from langchain_core.documents import Document  # noqa: E402
+from qdrant_client import AsyncQdrantClient  # noqa: E402
+
+from app.database.qdrant import QdrantDatabase  # noqa: E402
+from app.database.qdrant.filters import SearchFilter  # noqa: E402
+from benchmarks.bulk_upsert import FloatEmbeddings  # noqa: E402
+
+PAGES_PER_NOTEBOOK = 50
+
+
+def make_documents(count: int, notebooks: int):
+    documents = []
+    for i in range(count):
+        notebook = i % notebooks
+        page = (i // notebooks) % PAGES_PER_NOTEBOOK + 1
+        documents.append(
+            Document(
+                page_content=f"Notebook {notebook} page {page} chunk {i}",
+                metadata={
+                    "notebook_id": f"notebook-{notebook}",
+                    "session_id": f"session-{notebook % 10}",
+                    "page_number": str(page),
+                    "page": page,
+                },
+            )
+        )
+    return documents
+
+
+async def time_searches(qdrant_db: QdrantDatabase, queries, make_filter, offset=0):
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        await qdrant_db.search(
+            query, k=5, mode="dense", search_filter=make_filter(), offset=offset
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), statistics.quantiles(timings, n=20)[-1]
+
+
+async def main(url: str, count: int, notebooks: int, query_count: int):
+    client = AsyncQdrantClient(url=url) if url else AsyncQdrantClient(":memory:")
+    qdrant_db = QdrantDatabase(client=client, embeddings=FloatEmbeddings(size=768))
+    await qdrant_db.initialize()
+    await qdrant_db.delete_all_documents()
+    await qdrant_db.add_documents_bulk(make_documents(count, notebooks), wait=True)
+
+    rng = random.Random(0)
+    queries = [
+        f"question {i} about page {rng.randint(1, 50)}" for i in range(query_count)
+    ]
+    # Warm the embedding cache so only Qdrant is timed
+    for query in queries:
+        await qdrant_db.embed_query(query)
+
+    def notebook():
+        return SearchFilter(notebook_id=f"notebook-{rng.randrange(notebooks)}")
+
+    def notebook_pages():
+        first = rng.randint(1, PAGES_PER_NOTEBOOK - 10)
+        return SearchFilter(
+            notebook_id=f"notebook-{rng.randrange(notebooks)}",
+            page_from=first,
+            page_to=first + 9,
+        )
+
+    def session():
+        return SearchFilter(session_id=f"session-{rng.randrange(10)}")
+
+    cases = [
+        ("unfiltered:", lambda: None, 0),
+        ("notebook:", notebook, 0),
+        ("notebook + pages:", notebook_pages, 0),
+        ("session:", session, 0),
+        ("notebook, page 3:", notebook, 10),
+    ]
+    print(f"documents:            {count} in {notebooks} notebooks")
+    for label, make_filter, offset in cases:
+        p50, p95 = await time_searches(qdrant_db, queries, make_filter, offset)
+        print(f"{label:<22}p50 {p50:8.3f} ms   p95 {p95:8.3f} ms")
+
+    await qdrant_db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="", help="Qdrant URL, in-memory if empty")
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--notebooks", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.documents, args.notebooks, args.queries))
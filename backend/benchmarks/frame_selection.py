@@ -0,0 +1,90 @@
+# backend/benchmarks/frame_selection.py
+
+# Cost of picking the sharpest frame from the grabber's ring buffer, at full
+# size and at CAMERA_SHARPNESS_WIDTH, and of the combined flip against the
+# two flips it replaced. The buffer is a synthetic page settling after a
+# turn: motion blur that fades out over the frames, so the pick can be
+# checked against the frame known to be sharpest.
+#
+#   python -m benchmarks.frame_selection --width 1920 --height 1080
+
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.config import settings  # noqa: E402
+from app.utils.image import sharpness  # noqa: E402
+from benchmarks.image_derivatives import make_page  # noqa: E402
+
+
+def motion_blur(frame: np.ndarray, length: int) -> np.ndarray:
+    if length <= 1:
+        return frame
+    kernel = np.zeros((length, length), dtype=np.float32)
+    kernel[length // 2, :] = 1 / length
+    return cv2.filter2D(frame, -1, kernel)
+
+
+def settling_frames(page: np.ndarray, count: int):
+    # Blur fades as the page settles, with the last frame not the sharpest,
+    # as when the flipper arm nudges the page again
+    lengths = [max(1, 2 * (count - i) - 1) for i in range(count)]
+    lengths[-1] = 5
+    return [motion_blur(page, length) for length in lengths], lengths
+
+
+def median_ms(function, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(width: int, height: int, count: int, runs: int):
+    frames, lengths = settling_frames(make_page(width, height), count)
+    expected = int(np.argmin(lengths))
+
+    print(f"frame:                {width}x{height}, {count} buffered")
+    for label, score_width in (
+        ("full size:", None),
+        (
+            f"{settings.CAMERA_SHARPNESS_WIDTH} px wide:",
+            settings.CAMERA_SHARPNESS_WIDTH,
+        ),
+    ):
+        scores = [sharpness(frame, score_width) for frame in frames]
+        picked = int(np.argmax(scores))
+        elapsed = median_ms(
+            lambda: [sharpness(frame, score_width) for frame in frames], runs
+        )
+        print(
+            f"{label:<22}{elapsed:8.2f} ms   picked frame {picked + 1}"
+            f" ({'sharpest' if picked == expected else 'NOT sharpest'})"
+        )
+
+    frame = frames[expected]
+    two = median_ms(lambda: cv2.flip(cv2.flip(frame, 0), 1), runs)
+    one = median_ms(lambda: cv2.flip(frame, -1), runs)
+    print(f"two flips:            {two:8.2f} ms")
+    print(f"one combined flip:    {one:8.2f} ms")
+    newest = sharpness(frames[-1])
+    best = sharpness(frames[expected])
+    print(f"sharpness newest:     {newest:8.0f}   picked {best:.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=settings.CAMERA_FRAME_BUFFER_SIZE)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    main(args.width, args.height, args.frames, args.runs)
@@ -0,0 +1,97 @@
+# backend/benchmarks/frontend_broadcast.py
+
+# Cost of WebSocketService.broadcast_to_frontend to the caller (the camera and
+# ingestion loop) with hundreds of simulated frontends, a few of them slow,
+# compared with the previous one-after-another sends. Also reports how long
+# the fast clients take to receive every message.
+#
+#   python -m benchmarks.frontend_broadcast --clients 500 --slow 5
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.WebSocketService import WebSocketService  # noqa: E402
+
+
+class FakeWebSocket:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        await asyncio.sleep(self.latency)
+        self.received += 1
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+
+def make_clients(count: int, slow: int, slow_latency: float):
+    return [FakeWebSocket(slow_latency if i < slow else 0.0005) for i in range(count)]
+
+
+async def sequential_broadcast(clients, message: dict):
+    # The previous behaviour: serialize and await every client in turn
+    for client in clients:
+        await client.send_text(json.dumps(message))
+
+
+async def main(count: int, slow: int, slow_latency: float, messages: int):
+    payload = {"action": "click", "page_number": "1", "ocr_text": "x" * 2000}
+
+    clients = make_clients(count, slow, slow_latency)
+    timings = []
+    for _ in range(messages):
+        started = time.perf_counter()
+        await sequential_broadcast(clients, payload)
+        timings.append((time.perf_counter() - started) * 1000)
+    sequential = statistics.median(timings)
+
+    clients = make_clients(count, slow, slow_latency)
+    ids = [await WebSocketService.connect_frontend(client) for client in clients]
+    timings = []
+    started = time.perf_counter()
+    for _ in range(messages):
+        call_started = time.perf_counter()
+        await WebSocketService.broadcast_to_frontend(payload)
+        timings.append((time.perf_counter() - call_started) * 1000)
+    queued = statistics.median(timings)
+
+    # Clients dropped by the disconnect policy never catch up, hence the cap
+    fast_clients = clients[slow:]
+    while any(client.received < messages for client in fast_clients):
+        if time.perf_counter() - started > 10:
+            break
+        await asyncio.sleep(0.001)
+    delivered = (time.perf_counter() - started) * 1000
+    complete = sum(client.received == messages for client in fast_clients)
+    for frontend_id in ids:
+        WebSocketService.disconnect_frontend(frontend_id)
+
+    print(f"clients:              {count} ({slow} slow, {slow_latency * 1000:.0f} ms)")
+    print(f"sequential:           {sequential:10.2f} ms per broadcast")
+    print(f"queued:               {queued:10.2f} ms per broadcast")
+    print(
+        f"fast clients done:    {delivered:10.2f} ms for {messages} messages"
+        f" ({complete}/{len(fast_clients)} received all)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--slow", type=int, default=5)
+    parser.add_argument("--slow-latency", type=float, default=0.2)
+    parser.add_argument("--messages", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.slow, args.slow_latency, args.messages))
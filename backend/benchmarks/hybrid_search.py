@@ -0,0 +1,95 @@
+# backend/benchmarks/hybrid_search.py
+
+# Query latency of QdrantDatabase.search in dense, hybrid and lexical modes.
+# Runs against Qdrant's in-memory local mode with deterministic fake
+# embeddings that sleep for --embedding-latency to stand in for Vertex, so the
+# lexical path can be compared with a realistic embedding round trip.
+#
+#   python -m benchmarks.hybrid_search --documents 5000 --queries 200
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from langchain_core.documents import Document  # noqa: E402
+from qdrant_client import AsyncQdrantClient  # noqa: E402
+
+from app.database.qdrant import QdrantDatabase  # noqa: E402
+from benchmarks.bulk_upsert import FloatEmbeddings  # noqa: E402
+
+# Word frequencies in notes follow Zipf's law, which keeps most posting lists
+# short; a tiny uniform vocabulary would make every term match every chunk
+VOCABULARY = [f"term{rank}" for rank in range(20000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+class SlowEmbeddings(FloatEmbeddings):
+    latency: float = 0.0
+
+    async def aembed_query(self, text: str):
+        await asyncio.sleep(self.latency)
+        return self.embed_query(text)
+
+
+def make_documents(count: int, rng: random.Random):
+    return [
+        Document(
+            page_content=f"CSC{i} "
+            + " ".join(rng.choices(VOCABULARY, WEIGHTS, k=rng.randint(40, 120))),
+            metadata={"page_number": str(i // 4 + 1), "chunk_index": i % 4},
+        )
+        for i in range(count)
+    ]
+
+
+async def time_queries(qdrant_db: QdrantDatabase, queries, mode: str):
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        await qdrant_db.search(query, k=2, mode=mode)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main(count: int, query_count: int, latency: float):
+    rng = random.Random(0)
+    embeddings = SlowEmbeddings(size=768, latency=latency)
+    qdrant_db = QdrantDatabase(
+        client=AsyncQdrantClient(":memory:"), embeddings=embeddings
+    )
+    await qdrant_db.initialize()
+    await qdrant_db.delete_all_documents()
+    await qdrant_db.add_documents_bulk(make_documents(count, rng), wait=True)
+
+    queries = [
+        f"what is CSC{rng.randrange(count)} {rng.choice(VOCABULARY[:2000])}"
+        for _ in range(query_count)
+    ]
+    print(f"documents:            {count}")
+    print(f"embedding latency:    {latency * 1000:.0f} ms")
+    for mode in ("dense", "hybrid", "lexical"):
+        # Fresh cache per mode so every dense query pays the embedding call
+        qdrant_db.embedding_cache.clear()
+        timings = await time_queries(qdrant_db, queries, mode)
+        p50 = statistics.median(timings)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f"{mode + ':':<22}p50 {p50:8.3f} ms   p95 {p95:8.3f} ms")
+
+    await qdrant_db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument(
+        "--embedding-latency", type=float, default=0.08, help="Seconds per query"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.documents, args.queries, args.embedding_latency))
@@ -0,0 +1,83 @@
+# backend/benchmarks/image_derivatives.py
+
+# Encoded size of the thumbnail and preview derivatives against the original
+# capture JPEG, the time an ingestion worker takes to make them from that
+# JPEG, and the image bytes a chat answer with k source pages costs the
+# browser. Uses a synthetic page of text lines with sensor noise, so no
+# camera or bucket is needed.
+#
+#   python -m benchmarks.image_derivatives --width 1920 --height 1080 --k 4
+
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.config import settings  # noqa: E402
+from app.services.ClickPictureService.derivatives import make_derivatives  # noqa: E402
+from app.utils.image import decode_image  # noqa: E402
+
+
+def make_page(width: int, height: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    page = np.full((height, width, 3), 235, dtype=np.uint8)
+    line_height = max(height // 40, 12)
+    for y in range(line_height * 2, height - line_height, line_height):
+        words = " ".join(
+            "".join(chr(97 + c) for c in rng.integers(0, 26, rng.integers(2, 9)))
+            for _ in range(12)
+        )
+        cv2.putText(
+            page,
+            words,
+            (width // 20, y),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            line_height / 40,
+            (40, 40, 40),
+            1,
+            cv2.LINE_AA,
+        )
+    noise = rng.normal(0, 4, page.shape)
+    return np.clip(page + noise, 0, 255).astype(np.uint8)
+
+
+def main(width: int, height: int, k: int, runs: int):
+    frame = make_page(width, height)
+    original = cv2.imencode(".jpg", frame)[1].tobytes()
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        derivatives = make_derivatives(decode_image(original))
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(f"frame:                {width}x{height}")
+    print(f"original jpg:         {len(original):10,} bytes")
+    for size, data in derivatives.items():
+        label = f"{size} {settings.IMAGE_DERIVATIVE_FORMAT}:"
+        print(f"{label:<22}{len(data):10,} bytes")
+    print(f"derivatives made in:  {statistics.median(timings):10.2f} ms")
+
+    # Before, the grid loaded every original; now it loads thumbnails and
+    # the dialog loads one preview when a page is opened
+    before = k * len(original)
+    after = k * len(derivatives["thumbnail"]) + len(derivatives["preview"])
+    print(
+        f"bytes per answer:     {before:10,} -> {after:,}"
+        f" ({before / after:.1f}x less, k={k})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    main(args.width, args.height, args.k, args.runs)
@@ -0,0 +1,90 @@
+# backend/benchmarks/motion_settle.py
+
+# Time from a page turn to an auto capture against the fixed 3 s wait the Pi
+# used before. A fake camera feeds FrameGrabber in real time: a synthetic
+# page slides in and shakes for a given settle time, then lies still with
+# sensor noise. wait_until_still should return one stillness window after
+# the page settles, however long that takes.
+#
+#   python -m benchmarks.motion_settle --fps 30 --settle 0.3 0.6 1.2 2.0
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.config import settings  # noqa: E402
+from app.services.ClickPictureService.grabber import FrameGrabber  # noqa: E402
+from app.utils.image import frame_difference, to_gray  # noqa: E402
+from benchmarks.image_derivatives import make_page  # noqa: E402
+
+FIXED_WAIT_SECONDS = 3.0
+
+
+class SettlingCamera:
+    """Delivers frames at fps, moving the page until settle seconds after
+    the first read."""
+
+    def __init__(self, page: np.ndarray, fps: float, settle: float):
+        self.page = page
+        self.interval = 1 / fps
+        self.settle = settle
+        self.rng = np.random.default_rng(0)
+        self.started = None
+
+    def read(self):
+        time.sleep(self.interval)
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now
+        elapsed = now - self.started
+        frame = self.page
+        if elapsed < self.settle:
+            # Slide in from the side, then shake less and less
+            remaining = 1 - elapsed / self.settle
+            shift = int(self.page.shape[1] * 0.3 * remaining**2) + int(
+                self.rng.integers(-8, 9) * remaining
+            )
+            frame = np.roll(self.page, shift, axis=1)
+        noise = self.rng.integers(-3, 4, frame.shape, dtype=np.int16)
+        return True, np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def main(width: int, height: int, fps: float, settles):
+    page = make_page(width, height)
+    small = to_gray(page, settings.CAMERA_SETTLE_WIDTH)
+    timings = []
+    for _ in range(200):
+        started = time.perf_counter()
+        frame_difference(small, to_gray(page, settings.CAMERA_SETTLE_WIDTH))
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(f"frame:                {width}x{height} at {fps:g} fps")
+    print(f"difference per frame: {statistics.median(timings):8.3f} ms")
+    for settle in settles:
+        camera = SettlingCamera(page, fps, settle)
+        grabber = FrameGrabber(camera)
+        grabber.start()
+        settled = grabber.wait_until_still()
+        captured_after = time.monotonic() - camera.started
+        grabber.stop()
+        label = f"settles in {settle:g} s:"
+        print(
+            f"{label:<22}captured after {captured_after:6.2f} s"
+            f" vs {FIXED_WAIT_SECONDS:.2f} s fixed"
+            f"{'' if settled else ' (timed out)'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--settle", type=float, nargs="+", default=[0.3, 0.6, 1.2, 2.0])
+    args = parser.parse_args()
+    main(args.width, args.height, args.fps, args.settle)
@@ -0,0 +1,62 @@
+# backend/benchmarks/service_setup.py
+
+# Compares the per-request setup cost of /api/chat before and after the
+# service container. Needs the same .env and local Qdrant as the app.
+#
+#   python -m benchmarks.service_setup --requests 20
+
+import argparse
+import asyncio
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database.qdrant import QdrantDatabase  # noqa: E402
+from app.services.AIService import AIService  # noqa: E402
+from app.services.ServiceContainer import ServiceContainer  # noqa: E402
+
+
+async def build_per_request():
+    # What /api/chat used to do on every request
+    qdrant_db = QdrantDatabase()
+    await qdrant_db.initialize()
+    ai_service = AIService(qdrant_db)
+    await qdrant_db.close()
+    return ai_service
+
+
+async def time_per_request(setup, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await setup()
+    return (time.perf_counter() - started) / requests * 1000
+
+
+async def main(requests: int):
+    before = await time_per_request(build_per_request, requests)
+
+    # The lifespan builds the container once and requests reuse it
+    container_started = time.perf_counter()
+    services = ServiceContainer()
+    await services.start()
+    container_ms = (time.perf_counter() - container_started) * 1000
+
+    async def lookup():
+        return services.ai_service
+
+    after = await time_per_request(lookup, requests)
+    await services.close()
+
+    print(f"requests:               {requests}")
+    print(f"before (per request):   {before:.2f} ms")
+    print(f"after (per request):    {after:.4f} ms")
+    print(f"container startup once: {container_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,83 @@
+# backend/benchmarks/sse_stream.py
+
+# Frames and bytes per answer for one-frame-per-chunk streaming versus
+# stream_events, plus how much of the upstream stream is still consumed after
+# the client disconnects. Uses a fake LLM stream of small chunks and a fake
+# request, so no server or model is needed.
+#
+#   python -m benchmarks.sse_stream --chunks 400 --interval 0.002
+
+import argparse
+import asyncio
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.utils.sse import sse_frame, stream_events  # noqa: E402
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: float = float("inf")):
+        self.disconnect_at = time.perf_counter() + disconnect_after
+
+    async def is_disconnected(self) -> bool:
+        return time.perf_counter() >= self.disconnect_at
+
+
+class FakeLLMStream:
+    def __init__(self, chunks: int, interval: float):
+        self.chunks = chunks
+        self.interval = interval
+        self.produced = 0
+
+    async def events(self):
+        yield {"type": "source_images", "images": []}
+        for i in range(self.chunks):
+            await asyncio.sleep(self.interval)
+            self.produced += 1
+            yield {"type": "response", "content": f"tok{i} "}
+
+
+async def naive(upstream: FakeLLMStream):
+    async for event in upstream.events():
+        yield sse_frame(event)
+
+
+async def collect(frames):
+    count = 0
+    size = 0
+    async for frame in frames:
+        count += 1
+        size += len(frame)
+    return count, size
+
+
+async def main(chunks: int, interval: float, disconnect_after: float):
+    naive_frames, naive_bytes = await collect(naive(FakeLLMStream(chunks, interval)))
+    upstream = FakeLLMStream(chunks, interval)
+    frames, size = await collect(stream_events(FakeRequest(), upstream.events()))
+
+    print(f"chunks:               {chunks} every {interval * 1000:.1f} ms")
+    print(f"per-chunk frames:     {naive_frames} frames, {naive_bytes:,} bytes")
+    print(f"coalesced frames:     {frames} frames, {size:,} bytes")
+
+    upstream = FakeLLMStream(chunks, interval)
+    request = FakeRequest(disconnect_after=disconnect_after)
+    await collect(stream_events(request, upstream.events(), poll_seconds=0.05))
+    # Anything produced during this pause means the upstream was not cancelled
+    await asyncio.sleep(0.2)
+    print(
+        f"after disconnect:     {upstream.produced} of {chunks} chunks generated"
+        f" ({disconnect_after:.1f} s in)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=400)
+    parser.add_argument("--interval", type=float, default=0.002)
+    parser.add_argument("--disconnect-after", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.chunks, args.interval, args.disconnect_after))
@@ -0,0 +1,126 @@
+# backend/benchmarks/storage_cache.py
+
+# Read latency and hit ratio of StorageService.download_bytes without the
+# local disk cache, with it but revalidating every read, and with it trusting
+# generations seen in the last STORAGE_REVALIDATE_SECONDS, for a re-OCR pass
+# over pages the backend just captured. GCS is simulated by a fake storage client with a fixed metadata
+# latency and a download bandwidth, so no bucket is needed.
+#
+#   python -m benchmarks.storage_cache --pages 200 --cache-mb 256
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.StorageService import GCSBackend, StorageService  # noqa: E402
+from app.services.StorageService.disk_cache import DiskCache  # noqa: E402
+
+
+class FakeBlob:
+    def __init__(self, store: dict, name: str, latency: float, bandwidth: float):
+        self.store = store
+        self.name = name
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.cache_control = None
+        self.content_type = "image/jpeg"
+        self.updated = None
+        self.generation = store[name][0] if name in store else None
+        self.size = len(store[name][1]) if name in store else None
+
+    def upload_from_string(self, data: bytes, content_type: str = None):
+        time.sleep(self.latency + len(data) / self.bandwidth)
+        self.generation = (self.generation or 0) + 1
+        self.store[self.name] = (self.generation, data)
+
+    def download_as_bytes(self, if_generation_match: int = None) -> bytes:
+        generation, data = self.store[self.name]
+        time.sleep(self.latency + len(data) / self.bandwidth)
+        return data
+
+
+class FakeBucket:
+    def __init__(self, latency: float, bandwidth: float):
+        self.store = {}
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(self.store, name, self.latency, self.bandwidth)
+
+    def get_blob(self, name: str):
+        # Metadata only, so latency without the transfer
+        time.sleep(self.latency)
+        return self.blob(name) if name in self.store else None
+
+
+class FakeStorageClient:
+    def __init__(self, latency: float, bandwidth: float):
+        self._bucket = FakeBucket(latency, bandwidth)
+
+    def bucket(self, name: str) -> FakeBucket:
+        return self._bucket
+
+
+def read_pass(storage_service: StorageService, names):
+    timings = []
+    for name in names:
+        started = time.perf_counter()
+        assert storage_service.download_bytes(name)["success"]
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(pages: int, page_kb: int, cache_mb: int, latency: float, bandwidth_mb: float):
+    names = [f"captures/capture_{i}.jpg" for i in range(1, pages + 1)]
+    bandwidth = bandwidth_mb * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {}
+        for label, max_bytes, revalidate_seconds in (
+            ("no cache", 0, 0),
+            ("disk cache", cache_mb * 1024**2, 0),
+            ("known generations", cache_mb * 1024**2, 60),
+        ):
+            storage_service = StorageService(
+                GCSBackend(
+                    "benchmark", storage_client=FakeStorageClient(latency, bandwidth)
+                ),
+                disk_cache=DiskCache(os.path.join(directory, label), max_bytes),
+                revalidate_seconds=revalidate_seconds,
+            )
+            for name in names:
+                storage_service.upload_bytes(
+                    os.urandom(page_kb * 1024), name, sign_url=False
+                )
+            p50 = read_pass(storage_service, names)
+            results[label] = (p50, storage_service.disk_cache.stats())
+            storage_service.backend.close()
+
+    print(f"pages:                {pages} x {page_kb} KB, cache {cache_mb} MB")
+    print(
+        f"simulated GCS:        {latency * 1000:.0f} ms per request,"
+        f" {bandwidth_mb:.0f} MB/s"
+    )
+    for label, (p50, stats) in results.items():
+        print(
+            f"{label + ':':<22}p50 {p50:8.2f} ms   hit rate {stats['hit_rate']:.2f}"
+            f"   saved {stats['bytes_saved'] / 1024**2:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--page-kb", type=int, default=800)
+    parser.add_argument("--cache-mb", type=int, default=256)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--bandwidth-mb", type=float, default=20.0)
+    args = parser.parse_args()
+    main(args.pages, args.page_kb, args.cache_mb, args.latency, args.bandwidth_mb)
@@ -1,3 +1,10 @@
+// Pages stored with STORAGE_BACKEND=local are served by the backend's
+// /api/files route, at the STORAGE_LOCAL_URL the backend signs them with
+const storageLocalUrl = new URL(
+  process.env.STORAGE_LOCAL_URL ||
+    `${process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'}/api/files`
+);
+
 /** @type {import('next').NextConfig} */
 const nextConfig = {
   images: {
@@ -17,6 +24,12 @@ const nextConfig = {
         hostname: 'storage.googleapis.com',
         pathname: '**',
       },
+      {
+        protocol: storageLocalUrl.protocol.replace(':', ''),
+        hostname: storageLocalUrl.hostname,
+        port: storageLocalUrl.port,
+        pathname: `${storageLocalUrl.pathname.replace(/\/$/, '')}/**`,
+      },
     ],
   },
 };
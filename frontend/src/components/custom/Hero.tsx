@@ -46,6 +46,7 @@ export const Hero: FC = () => {
           role: msg.role,
           content: msg.content,
         })),
+        filters: { notebook_id: process.env.NEXT_PUBLIC_NOTEBOOK_ID },
       });
 
       if (!response.status) {
@@ -10,6 +10,7 @@ import { X } from 'lucide-react';
 interface SourceImage {
   page_number: string;
   image_path: string;
+  thumbnail_path?: string;
   score: number;
 }
 
@@ -43,7 +44,7 @@ export const SourceImages: FC<SourceImagesProps> = ({ images }) => {
           >
             <div className="aspect-[3/4] relative">
               <Image
-                src={image.image_path}
+                src={image.thumbnail_path ?? image.image_path}
                 alt={`Page ${image.page_number}`}
                 fill
                 className="object-cover"
@@ -10,9 +10,11 @@ import { Navbar } from './Navbar';
 type WebSocketState = 'disconnected' | 'connected' | 'scanning' | 'processing' | 'finished';
 
 interface WebSocketMessage {
-  action: 'start' | 'scanning' | 'processing' | 'end';
+  action: 'start' | 'scanning' | 'processing' | 'duplicate' | 'end';
   page_number?: number;
   ocr_text?: string;
+  session_id?: string;
+  notebook_id?: string;
 }
 
 export const WebSocketStateManager: FC = () => {
@@ -21,7 +23,13 @@ export const WebSocketStateManager: FC = () => {
   const router = useRouter();
 
   useEffect(() => {
-    const ws = new WebSocket(`${process.env.NEXT_PUBLIC_BACKEND_WEBSOCKET_URL}/ws/frontend`);
+    // Follow a single scan session when one is configured, otherwise all of them
+    const sessionId = process.env.NEXT_PUBLIC_SCAN_SESSION_ID;
+    const ws = new WebSocket(
+      `${process.env.NEXT_PUBLIC_BACKEND_WEBSOCKET_URL}/ws/frontend${
+        sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : ''
+      }`
+    );
 
     ws.onopen = () => {
       console.log('WebSocket Connected');
@@ -47,6 +55,10 @@ export const WebSocketStateManager: FC = () => {
             setCurrentPage(message.page_number);
           }
           break;
+        case 'duplicate':
+          // The page did not turn, so the capture was skipped
+          console.warn(`Page ${message.page_number} was captured again, skipping it`);
+          break;
         case 'end':
           setState('finished');
           router.push('/chat');
@@ -51,6 +51,7 @@ export interface SpeechRecognitionAlternative {
 export type SourceImage = {
   page_number: string;
   image_path: string;
+  thumbnail_path?: string;
   score: number;
 };
 
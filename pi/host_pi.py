@@ -13,11 +13,20 @@ load_dotenv()
 GPIO.setmode(GPIO.BOARD)
 GPIO.setup(15, GPIO.IN)
 
-async def send_message(websocket, action):
-    message = {"action": action}
+async def send_message(websocket, action, **fields):
+    message = {"action": action, **fields}
     await websocket.send(json.dumps(message))
     print(f"Sent >>> {message}")
 
+async def wait_for_flip(websocket, request_id):
+    # The backend also sends session, start, page progress and ingestion
+    # error messages; only the flip answering this request turns the page
+    while True:
+        message = json.loads(await websocket.recv())
+        print(f"Received <<< {message}")
+        if message.get("action") == "flip" and message.get("request_id") == request_id:
+            return message
+
 async def wait_for_start():
     print("Waiting for 'start' action...")
     while True:
@@ -31,6 +40,11 @@ async def main():
     uri = os.getenv("WEBSOCKET_URI")
     if not uri:
         raise ValueError("WEBSOCKET_URI is not set in the .env file")
+    # "auto" lets the backend capture as soon as a page settles; "timed"
+    # clicks on a fixed schedule
+    capture_mode = os.getenv("CAPTURE_MODE", "auto")
+    # Numbers each "auto" request, so a late reply is never taken for the next
+    request_id = 0
     async with connect(uri) as websocket:
         await asyncio.sleep(2)  # Wait for the connection to be established
         while True:
@@ -43,14 +57,28 @@ async def main():
 
             # Perform 3 picture clicks
             for i in range(3):
-                print(f"--- Clicking picture {i + 1} ---")
-                await send_message(websocket, "click")
+                if capture_mode == "auto":
+                    # The backend watches the page settle, captures it and
+                    # replies with "flip"
+                    print(f"--- Capturing picture {i + 1} once it settles ---")
+                    request_id += 1
+                    await send_message(websocket, "auto", request_id=request_id)
+                    message = await wait_for_flip(websocket, request_id)
+                    print(f"-- Settled in {message['settle_ms']} ms --")
+                    if "error" in message:
+                        print(f"-- Capture failed: {message['error']} --")
+                    elif "duplicate_of" in message:
+                        print(f"-- Same as page {message['duplicate_of']}, not turned? --")
+                else:
+                    print(f"--- Clicking picture {i + 1} ---")
+                    await send_message(websocket, "click")
 
                 print("-- Flipping --")
                 flip()
                 print("-- Done Flipping --")
 
-                await asyncio.sleep(3)  # Simulate delay between clicks
+                if capture_mode != "auto":
+                    await asyncio.sleep(3)  # Simulate delay between clicks
 
             print("-- Sending 'end' action --")
             await send_message(websocket, "end")